@@ -15,11 +15,15 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
 from models import db
+from migrate import run_migrations
+from utils.alert_writer import alert_writer
+from utils.retention import start_retention_scheduler
 from routes.auth import auth_bp
 from routes.checklist import checklist_bp
 from routes.members import members_bp
 from routes.alerts import alerts_bp
 from routes.suggestions import suggestions_bp
+from routes.stream import stream_bp
 
 # Load environment variables
 load_dotenv()
@@ -33,11 +37,15 @@ def create_app():
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'dev-secret-key')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    # Trust the role claim in tokens instead of loading the user on every request
+    app.config['JWT_ROLE_CLAIMS'] = os.getenv('JWT_ROLE_CLAIMS', 'false').lower() == 'true'
     
     # Initialize extensions
     CORS(app, resources={r"/api/*": {"origins": "*"}})
     JWTManager(app)
     db.init_app(app)
+    # Alerts are written in batches by a background thread
+    alert_writer.init_app(app)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -45,14 +53,27 @@ def create_app():
     app.register_blueprint(members_bp, url_prefix='/api/members')
     app.register_blueprint(alerts_bp, url_prefix='/api/alerts')
     app.register_blueprint(suggestions_bp, url_prefix='/api/suggestions')
+    app.register_blueprint(stream_bp, url_prefix='/api/stream')
     
-    # Create tables if they don't exist
+    # Create tables if they don't exist, then bring older databases up to
+    # date (new columns and indexes); set AUTO_MIGRATE=false to run
+    # migrate.py by hand instead
     with app.app_context():
         try:
             db.create_all()
+            if os.getenv('AUTO_MIGRATE', 'true').lower() == 'true':
+                run_migrations(db.engine, log=app.logger.info)
         except Exception as e:
             print(f"Error creating database tables: {e}")
     
+    # Optionally purge expired alerts in the background (see retention.py)
+    if os.getenv('RETENTION_INTERVAL_HOURS'):
+        start_retention_scheduler(
+            app,
+            float(os.getenv('RETENTION_INTERVAL_HOURS')),
+            archive_dir=os.getenv('ALERT_ARCHIVE_DIR', os.path.join(app.instance_path, 'alert_archive'))
+        )
+    
     @app.route('/')
     def index():
         return {
@@ -63,7 +84,8 @@ def create_app():
                 "checklists": "/api/checklists",
                 "members": "/api/members",
                 "alerts": "/api/alerts",
-                "suggestions": "/api/suggestions"
+                "suggestions": "/api/suggestions",
+                "stream": "/api/stream"
             }
         }
     
@@ -0,0 +1,133 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, text
+from sqlalchemy.schema import CreateTable
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db
+from migrate import run_migrations
+
+# The lookups every route performs, with the parameters used for the timing runs
+HOT_QUERIES = [
+    ("items by checklist and status",
+     "SELECT COUNT(*) FROM checklist_items WHERE checklist_id = :checklist_id AND status = 'Packed'"),
+    ("latest alerts of a checklist",
+     "SELECT id, type, message, created_at FROM alerts WHERE checklist_id = :checklist_id "
+     "ORDER BY created_at DESC, id DESC LIMIT 51"),
+    ("memberships of a user",
+     "SELECT checklist_id FROM team_members WHERE user_id = :user_id"),
+    ("checklists created by a user",
+     "SELECT id, name FROM checklists WHERE created_by = :user_id"),
+    ("member picker search by name prefix",
+     "SELECT id, name, email, role FROM users WHERE name_normalized >= :prefix "
+     "AND name_normalized < :prefix_end ORDER BY name_normalized, id LIMIT 51"),
+]
+
+STATUSES = ['To Pack', 'Packed', 'Delivered']
+
+def create_schema_without_indexes(engine):
+    """Create the tables the way databases predating the indexes look"""
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            connection.execute(CreateTable(table))
+
+def seed(engine, users, checklists, items, alerts):
+    """Bulk-load a synthetic dataset"""
+    rng = random.Random(42)
+    now = datetime.utcnow()
+
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO users (id, name, email, password_hash, role, created_at) "
+            "VALUES (:id, :name, :email, 'x', 'member', :created_at)"
+        ), [{"id": i, "name": f"user{i}", "email": f"user{i}@example.com", "created_at": now}
+            for i in range(1, users + 1)])
+
+        connection.execute(text(
+            "INSERT INTO checklists (id, name, created_by, created_at) "
+            "VALUES (:id, :name, :created_by, :created_at)"
+        ), [{"id": i, "name": f"checklist{i}", "created_by": rng.randint(1, users), "created_at": now}
+            for i in range(1, checklists + 1)])
+
+        members = set()
+        for checklist_id in range(1, checklists + 1):
+            for _ in range(5):
+                members.add((checklist_id, rng.randint(1, users)))
+        connection.execute(text(
+            "INSERT INTO team_members (checklist_id, user_id, created_at) "
+            "VALUES (:checklist_id, :user_id, :created_at)"
+        ), [{"checklist_id": c, "user_id": u, "created_at": now} for c, u in members])
+
+        batch = 50000
+        for start in range(0, items, batch):
+            connection.execute(text(
+                "INSERT INTO checklist_items (title, status, checklist_id, assigned_to, created_at) "
+                "VALUES (:title, :status, :checklist_id, :assigned_to, :created_at)"
+            ), [{"title": f"item{i}", "status": rng.choice(STATUSES),
+                 "checklist_id": rng.randint(1, checklists),
+                 "assigned_to": rng.randint(1, users), "created_at": now}
+                for i in range(start, min(start + batch, items))])
+
+        connection.execute(text(
+            "INSERT INTO alerts (type, message, checklist_id, created_at) "
+            "VALUES ('update', :message, :checklist_id, :created_at)"
+        ), [{"message": f"alert{i}", "checklist_id": rng.randint(1, checklists),
+             "created_at": now - timedelta(seconds=i)}
+            for i in range(alerts)])
+
+def measure(engine, params, repeat):
+    """Print the query plan and average latency of every hot query"""
+    with engine.connect() as connection:
+        for label, sql in HOT_QUERIES:
+            plan = connection.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+            started = time.perf_counter()
+            for _ in range(repeat):
+                connection.execute(text(sql), params).fetchall()
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            print(f"  {label}: {elapsed_ms:.2f} ms")
+            for row in plan:
+                print(f"    {row[-1]}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare hot query plans before and after the index migration")
+    parser.add_argument('--items', type=int, default=1000000)
+    parser.add_argument('--checklists', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=5000)
+    parser.add_argument('--alerts', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine('sqlite:///' + os.path.join(tmp, 'benchmark.db'))
+        create_schema_without_indexes(engine)
+
+        print(f"Seeding {args.items} items, {args.alerts} alerts, {args.checklists} checklists, {args.users} users...")
+        started = time.perf_counter()
+        seed(engine, args.users, args.checklists, args.items, args.alerts)
+        print(f"Seeded in {time.perf_counter() - started:.1f} s")
+
+        params = {"checklist_id": args.checklists // 2, "user_id": args.users // 2,
+                  "prefix": "user12", "prefix_end": "user13"}
+
+        print("\nBefore migration:")
+        measure(engine, params, args.repeat)
+
+        print("\nApplying migrations:")
+        run_migrations(engine, log=lambda message: print("  " + message))
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+
+        print("\nAfter migration:")
+        measure(engine, params, args.repeat)
+
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
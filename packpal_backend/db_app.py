@@ -5,6 +5,9 @@ import json
 import secrets
 from datetime import datetime
 from flask_cors import CORS
+import os
+from utils.db_pool import ConnectionPool
+from utils.pagination import parse_page_args, page_and_cursor
 
 app = Flask(__name__)
 CORS(app)
@@ -19,14 +22,17 @@ db_config = {
     'cursorclass': pymysql.cursors.DictCursor
 }
 
+# Connection pool shared by all requests; each request reuses one connection
+db_pool = ConnectionPool(db_config, max_size=int(os.getenv('DB_POOL_SIZE', 10)))
+db_pool.init_app(app)
+
 # User session tokens
 active_tokens = {}
 
 def get_db_connection():
-    """Establish database connection"""
+    """Get the pooled connection for the current request"""
     try:
-        connection = pymysql.connect(**db_config)
-        return connection
+        return db_pool.get_connection()
     except Exception as e:
         print(f"Database connection error: {e}")
         return None
@@ -44,13 +50,11 @@ def execute_query(query, params=None, fetch=True):
                 result = cursor.fetchall()
             else:
                 connection.commit()
-                result = {"affected_rows": cursor.rowcount}
+                result = {"affected_rows": cursor.rowcount, "last_insert_id": cursor.lastrowid}
         return result, 200
     except Exception as e:
         print(f"Query execution error: {e}")
         return {"error": str(e)}, 500
-    finally:
-        connection.close()
 
 def hash_password(password):
     """Create SHA-256 hash of the password"""
@@ -76,6 +80,11 @@ def home():
     """Home route"""
     return jsonify({"message": "Welcome to PackPal API"})
 
+@app.route('/api/db/pool-stats')
+def pool_stats():
+    """Connection pool usage for monitoring"""
+    return jsonify(db_pool.stats())
+
 @app.route('/api/auth/signup', methods=['POST'])
 def signup():
     """User registration endpoint"""
@@ -100,58 +109,7 @@ def signup():
     # Hash password
     password_hash = hash_password(data['password'])
     
-    # Insert new user
-    insert_query = """
-    INSERT INTO users (username, email, password_hash)
-    VALUES (%s, %s, %s)
-    """
-    result, status = execute_query(
-        insert_query, 
-        (data['username'], data['email'], password_hash),
-        fetch=False
-    )
-    
-    if status != 200:
-        return jsonify(result), status
-    
-    # Get the new user ID
-    user_query = "SELECT id FROM users WHERE email = %s"
-    user_result, user_status = execute_query(user_query, (data['email'],))
-    
-    if user_status != 200 or not user_result:
-        return jsonify({"error": "User creation failed"}), 500
-    
-    user_id = user_result[0]['id']
-    
-    # Create default checklist
-    checklist_query = """
-    INSERT INTO checklists (title, creator_id)
-    VALUES (%s, %s)
-    """
-    result, status = execute_query(
-        checklist_query,
-        ("My First Checklist", user_id),
-        fetch=False
-    )
-    
-    if status != 200:
-        return jsonify(result), status
-    
-    # Get the new checklist ID
-    checklist_query = """
-    SELECT id FROM checklists 
-    WHERE creator_id = %s 
-    ORDER BY created_at DESC 
-    LIMIT 1
-    """
-    checklist_result, checklist_status = execute_query(checklist_query, (user_id,))
-    
-    if checklist_status != 200 or not checklist_result:
-        return jsonify({"error": "Checklist creation failed"}), 500
-    
-    checklist_id = checklist_result[0]['id']
-    
-    # Add default items
+    # Default items for the first checklist
     default_items = [
         "Passport",
         "Travel Insurance",
@@ -160,23 +118,32 @@ def signup():
         "Medications"
     ]
     
-    for item in default_items:
-        item_query = """
-        INSERT INTO checklist_items (text, checklist_id)
-        VALUES (%s, %s)
-        """
-        execute_query(item_query, (item, checklist_id), fetch=False)
-    
-    # Create welcome alert
-    alert_query = """
-    INSERT INTO alerts (message, user_id)
-    VALUES (%s, %s)
-    """
-    execute_query(
-        alert_query,
-        ("Welcome to PackPal! Start by customizing your checklist.", user_id),
-        fetch=False
-    )
+    # Create the user, their first checklist, its items and the welcome alert
+    # in a single transaction, using the generated ids instead of re-selecting
+    try:
+        with db_pool.unit_of_work() as uow:
+            user_id = uow.execute(
+                "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
+                (data['username'], data['email'], password_hash)
+            )
+            
+            checklist_id = uow.execute(
+                "INSERT INTO checklists (title, creator_id) VALUES (%s, %s)",
+                ("My First Checklist", user_id)
+            )
+            
+            uow.execute_many(
+                "INSERT INTO checklist_items (text, checklist_id) VALUES (%s, %s)",
+                [(item, checklist_id) for item in default_items]
+            )
+            
+            uow.execute(
+                "INSERT INTO alerts (message, user_id) VALUES (%s, %s)",
+                ("Welcome to PackPal! Start by customizing your checklist.", user_id)
+            )
+    except Exception as e:
+        print(f"Signup error: {e}")
+        return jsonify({"error": "User creation failed"}), 500
     
     # Generate token for auto-login
     token = generate_token()
@@ -278,37 +245,23 @@ def create_checklist(user_id):
     if 'title' not in data or not data['title'].strip():
         return jsonify({"error": "Checklist title is required"}), 400
     
-    query = """
-    INSERT INTO checklists (title, creator_id)
-    VALUES (%s, %s)
-    """
-    result, status = execute_query(query, (data['title'], user_id), fetch=False)
-    
-    if status != 200:
-        return jsonify(result), status
-    
-    # Get the ID of the newly created checklist
-    query = """
-    SELECT id FROM checklists 
-    WHERE creator_id = %s 
-    ORDER BY created_at DESC 
-    LIMIT 1
-    """
-    result, status = execute_query(query, (user_id,))
-    
-    if status != 200 or not result:
-        return jsonify({"error": "Failed to retrieve checklist ID"}), 500
-    
-    checklist_id = result[0]['id']
+    items = data['items'] if isinstance(data.get('items'), list) else []
     
-    # Add items if provided
-    if 'items' in data and isinstance(data['items'], list):
-        for item in data['items']:
-            item_query = """
-            INSERT INTO checklist_items (text, checklist_id)
-            VALUES (%s, %s)
-            """
-            execute_query(item_query, (item, checklist_id), fetch=False)
+    # Create the checklist and its items in one transaction
+    try:
+        with db_pool.unit_of_work() as uow:
+            checklist_id = uow.execute(
+                "INSERT INTO checklists (title, creator_id) VALUES (%s, %s)",
+                (data['title'], user_id)
+            )
+            
+            uow.execute_many(
+                "INSERT INTO checklist_items (text, checklist_id) VALUES (%s, %s)",
+                [(item, checklist_id) for item in items]
+            )
+    except Exception as e:
+        print(f"Checklist creation error: {e}")
+        return jsonify({"error": str(e)}), 500
     
     return jsonify({
         "message": "Checklist created successfully",
@@ -450,19 +403,7 @@ def create_checklist_item(user_id):
     if status != 200:
         return jsonify(result), status
     
-    # Get the new item ID
-    query = """
-    SELECT id FROM checklist_items
-    WHERE checklist_id = %s
-    ORDER BY created_at DESC
-    LIMIT 1
-    """
-    result, status = execute_query(query, (checklist_id,))
-    
-    if status != 200 or not result:
-        return jsonify({"error": "Failed to retrieve item ID"}), 500
-    
-    item_id = result[0]['id']
+    item_id = result['last_insert_id']
     
     return jsonify({
         "message": "Item added successfully",
@@ -558,19 +499,37 @@ def delete_checklist_item(user_id, item_id):
 @app.route('/api/alerts', methods=['GET'])
 @auth_required
 def get_alerts(user_id):
-    """Get all alerts for current user"""
-    query = """
+    """Get alerts for current user, newest first, one page at a time"""
+    try:
+        before, limit = parse_page_args(request.args)
+    except ValueError:
+        return jsonify({"error": "Invalid pagination parameters"}), 400
+    
+    # Keyset pagination: continue strictly after the (created_at, id) cursor
+    params = [user_id]
+    cursor_filter = ""
+    if before:
+        cursor_filter = "AND (created_at < %s OR (created_at = %s AND id < %s))"
+        params.extend([before[0], before[0], before[1]])
+    
+    query = f"""
     SELECT id, message, read, created_at
     FROM alerts
-    WHERE user_id = %s
-    ORDER BY created_at DESC
+    WHERE user_id = %s {cursor_filter}
+    ORDER BY created_at DESC, id DESC
+    LIMIT %s
     """
-    result, status = execute_query(query, (user_id,))
+    # Fetch one extra row to know whether there is another page
+    params.append(limit + 1)
+    result, status = execute_query(query, tuple(params))
     
     if status != 200:
         return jsonify(result), status
     
-    return jsonify({"alerts": result}), 200
+    alerts, next_cursor = page_and_cursor(
+        result, limit, lambda row: row['created_at'], lambda row: row['id']
+    )
+    return jsonify({"alerts": alerts, "next_cursor": next_cursor}), 200
 
 @app.route('/api/alerts/<int:alert_id>', methods=['PUT'])
 @auth_required
@@ -43,7 +43,8 @@ CREATE TABLE alerts (
     user_id INT,
     read BOOLEAN DEFAULT FALSE,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+    FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX ix_alerts_user_created_id (user_id, created_at, id)
 );
 
 -- Create a sample admin user with password 'admin123'
@@ -0,0 +1,255 @@
+import argparse
+import os
+import sys
+from datetime import datetime
+from sqlalchemy import create_engine, inspect, text
+import pymysql
+
+# Use PyMySQL instead of MySQLdb
+pymysql.install_as_MySQLdb()
+
+from models import ChecklistStats, AlertRollup
+from utils.stats import rebuild_stats
+from utils.conflicts import backfill_normalized_titles
+from utils.directory import backfill_normalized_names, backfill_normalized_emails
+
+# Same database the Flask app uses by default (instance/packpal.db)
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DATABASE_URL = 'sqlite:///' + os.path.join(current_dir, 'instance', 'packpal.db')
+
+class AddIndex:
+    """Create a secondary index if the table does not already have it"""
+
+    def __init__(self, table, name, columns):
+        self.table = table
+        self.name = name
+        self.columns = columns
+
+    def describe(self):
+        return f"add index {self.name} on {self.table} ({', '.join(self.columns)})"
+
+    def is_applied(self, connection):
+        indexes = inspect(connection).get_indexes(self.table)
+        return any(index['name'] == self.name for index in indexes)
+
+    def apply(self, connection):
+        columns = ', '.join(self.columns)
+        if connection.dialect.name == 'mysql':
+            # Online DDL: build the index in place while reads and writes continue
+            connection.execute(text(
+                f"ALTER TABLE {self.table} ADD INDEX {self.name} ({columns}), "
+                f"ALGORITHM=INPLACE, LOCK=NONE"
+            ))
+        else:
+            # SQLite has no online index builds; this holds the write lock
+            # only for the duration of the build
+            connection.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {self.name} ON {self.table} ({columns})"
+            ))
+
+class DropIndex:
+    """Drop a secondary index if the table still has it"""
+
+    def __init__(self, table, name):
+        self.table = table
+        self.name = name
+
+    def describe(self):
+        return f"drop index {self.name} on {self.table}"
+
+    def is_applied(self, connection):
+        indexes = inspect(connection).get_indexes(self.table)
+        return not any(index['name'] == self.name for index in indexes)
+
+    def apply(self, connection):
+        if connection.dialect.name == 'mysql':
+            connection.execute(text(
+                f"ALTER TABLE {self.table} DROP INDEX {self.name}, ALGORITHM=INPLACE, LOCK=NONE"
+            ))
+        else:
+            connection.execute(text(f"DROP INDEX IF EXISTS {self.name}"))
+
+class AddColumn:
+    """Add a column if the table does not already have it"""
+
+    def __init__(self, table, name, definition):
+        self.table = table
+        self.name = name
+        self.definition = definition
+
+    def describe(self):
+        return f"add column {self.table}.{self.name} {self.definition}"
+
+    def is_applied(self, connection):
+        columns = inspect(connection).get_columns(self.table)
+        return any(column['name'] == self.name for column in columns)
+
+    def apply(self, connection):
+        if connection.dialect.name == 'mysql':
+            connection.execute(text(
+                f"ALTER TABLE {self.table} ADD COLUMN {self.name} {self.definition}, "
+                f"ALGORITHM=INPLACE, LOCK=NONE"
+            ))
+        else:
+            connection.execute(text(f"ALTER TABLE {self.table} ADD COLUMN {self.name} {self.definition}"))
+
+class CreateTable:
+    """Create a table from its model definition if it does not exist yet"""
+
+    def __init__(self, table):
+        self.table = table
+
+    def describe(self):
+        return f"create table {self.table.name}"
+
+    def is_applied(self, connection):
+        return inspect(connection).has_table(self.table.name)
+
+    def apply(self, connection):
+        self.table.create(connection)
+
+class RunPython:
+    """Run a data migration function with the migration's connection"""
+
+    def __init__(self, description, function):
+        self.description = description
+        self.function = function
+
+    def describe(self):
+        return self.description
+
+    def is_applied(self, connection):
+        return False
+
+    def apply(self, connection):
+        self.function(connection)
+
+# Ordered list of (migration id, operations). Never edit an entry once it has
+# shipped; append a new migration instead.
+MIGRATIONS = [
+    ('0001_hot_path_indexes', [
+        AddIndex('checklist_items', 'ix_checklist_items_checklist_status', ['checklist_id', 'status']),
+        AddIndex('alerts', 'ix_alerts_checklist_created', ['checklist_id', 'created_at']),
+        AddIndex('team_members', 'ix_team_members_user_id', ['user_id']),
+        AddIndex('checklists', 'ix_checklists_created_by', ['created_by']),
+    ]),
+    ('0002_alerts_keyset_index', [
+        # Cursor pagination orders by (created_at, id); the new index covers
+        # both and makes the old (checklist_id, created_at) one redundant.
+        # Add before drop so MySQL always has an index for the foreign key.
+        AddIndex('alerts', 'ix_alerts_checklist_created_id', ['checklist_id', 'created_at', 'id']),
+        DropIndex('alerts', 'ix_alerts_checklist_created'),
+    ]),
+    ('0003_checklist_stats', [
+        CreateTable(ChecklistStats.__table__),
+        RunPython("backfill checklist_stats from checklist_items", rebuild_stats),
+    ]),
+    ('0004_checklist_version', [
+        AddColumn('checklists', 'version', 'INTEGER NOT NULL DEFAULT 1'),
+    ]),
+    ('0005_alert_retention', [
+        AddIndex('alerts', 'ix_alerts_type_created', ['type', 'created_at']),
+        CreateTable(AlertRollup.__table__),
+    ]),
+    ('0006_item_title_normalized', [
+        AddColumn('checklist_items', 'title_normalized', 'VARCHAR(100)'),
+        RunPython("backfill checklist_items.title_normalized", backfill_normalized_titles),
+        AddIndex('checklist_items', 'ix_checklist_items_conflict', ['checklist_id', 'title_normalized', 'assigned_to']),
+    ]),
+    ('0007_user_name_normalized', [
+        AddColumn('users', 'name_normalized', 'VARCHAR(100)'),
+        RunPython("backfill users.name_normalized", backfill_normalized_names),
+        AddIndex('users', 'ix_users_name_normalized', ['name_normalized', 'id']),
+    ]),
+    ('0008_user_email_normalized', [
+        AddColumn('users', 'email_normalized', 'VARCHAR(120)'),
+        RunPython("backfill users.email_normalized", backfill_normalized_emails),
+        AddIndex('users', 'ix_users_email_normalized', ['email_normalized']),
+    ]),
+]
+
+def ensure_migrations_table(connection):
+    """Create the bookkeeping table that records applied migrations"""
+    connection.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "id VARCHAR(100) PRIMARY KEY, "
+        "applied_at TIMESTAMP NOT NULL)"
+    ))
+
+def applied_migrations(connection):
+    """Get the ids of migrations that have already been applied"""
+    rows = connection.execute(text("SELECT id FROM schema_migrations"))
+    return {row[0] for row in rows}
+
+def run_migrations(engine, dry_run=False, log=print):
+    """
+    Apply every pending migration in order.
+
+    Each operation checks the live schema first, so databases created by
+    db.create_all() (which already have the indexes) are only recorded as
+    migrated. Each migration is committed separately so an interrupted run
+    can simply be restarted.
+
+    Args:
+        engine: SQLAlchemy engine for the target database
+        dry_run (bool): Only report what would be applied
+        log (callable): Function used to report progress
+
+    Returns:
+        list: IDs of the migrations that were applied
+    """
+    with engine.begin() as connection:
+        ensure_migrations_table(connection)
+        done = applied_migrations(connection)
+
+    applied = []
+    for migration_id, operations in MIGRATIONS:
+        if migration_id in done:
+            continue
+
+        log(f"Migration {migration_id}")
+        with engine.begin() as connection:
+            for operation in operations:
+                if operation.is_applied(connection):
+                    log(f"  skip: {operation.describe()} (already present)")
+                    continue
+
+                log(f"  {'would ' if dry_run else ''}{operation.describe()}")
+                if not dry_run:
+                    operation.apply(connection)
+
+            if not dry_run:
+                connection.execute(
+                    text("INSERT INTO schema_migrations (id, applied_at) VALUES (:id, :applied_at)"),
+                    {"id": migration_id, "applied_at": datetime.utcnow()}
+                )
+        applied.append(migration_id)
+
+    if not applied:
+        log("Database schema is up to date")
+
+    return applied
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply PackPal schema migrations")
+    parser.add_argument(
+        '--database-url',
+        default=os.getenv('DATABASE_URL', DEFAULT_DATABASE_URL),
+        help="SQLAlchemy URL of the database to migrate (defaults to $DATABASE_URL or the app's SQLite database)"
+    )
+    parser.add_argument('--dry-run', action='store_true', help="Show pending operations without applying them")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    try:
+        run_migrations(engine, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"Error applying migrations: {e}")
+        return 1
+    finally:
+        engine.dispose()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
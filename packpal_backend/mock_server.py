@@ -1,77 +1,39 @@
 from flask import Flask, jsonify, request
 from flask_cors import CORS
-import json
 import os
+from mock_store import LogStore
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
-# Persistence file paths
+# Persistence directory
 DB_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'db')
 os.makedirs(DB_DIR, exist_ok=True)
-USERS_FILE = os.path.join(DB_DIR, 'users.json')
-CHECKLISTS_FILE = os.path.join(DB_DIR, 'checklists.json')
-ITEMS_FILE = os.path.join(DB_DIR, 'items.json')
 
-# Initialize mock database 
-def load_db():
-    mock_db = {
-        "users": {},
-        "checklists": {},
-        "checklist_items": {}
-    }
-    
-    # Load users if file exists
-    if os.path.exists(USERS_FILE):
-        try:
-            with open(USERS_FILE, 'r') as f:
-                mock_db["users"] = json.load(f)
-        except:
-            print("Error loading users file")
-    
-    # Load checklists if file exists
-    if os.path.exists(CHECKLISTS_FILE):
-        try:
-            with open(CHECKLISTS_FILE, 'r') as f:
-                mock_db["checklists"] = json.load(f)
-        except:
-            print("Error loading checklists file")
-    
-    # Load items if file exists
-    if os.path.exists(ITEMS_FILE):
-        try:
-            with open(ITEMS_FILE, 'r') as f:
-                mock_db["checklist_items"] = json.load(f)
-        except:
-            print("Error loading items file")
-    
-    return mock_db
+# Tables live in memory; mutations are appended to a log in DB_DIR and
+# periodically compacted into <table>.jsonl snapshots (see mock_store.py).
+# Users are keyed by email, checklists and items by their integer ID.
+store = LogStore(DB_DIR, {
+    "users": str,
+    "checklists": int,
+    "checklist_items": int
+}, legacy_files={
+    # Whole-file JSON snapshots from before the log, read until the first
+    # compaction writes the .jsonl files
+    "users": 'users.json',
+    "checklists": 'checklists.json',
+    "checklist_items": 'items.json'
+}, indexes={
+    # Users are keyed by email, so they need no index for login/signup
+    "checklists": ["creator_id"],
+    "checklist_items": ["checklist_id"]
+})
+mock_db = store.tables
 
-# Save database to files
-def save_db(mock_db):
-    # Save users
-    try:
-        with open(USERS_FILE, 'w') as f:
-            json.dump(mock_db["users"], f)
-    except:
-        print("Error saving users file")
-    
-    # Save checklists
-    try:
-        with open(CHECKLISTS_FILE, 'w') as f:
-            json.dump(mock_db["checklists"], f)
-    except:
-        print("Error saving checklists file")
-    
-    # Save items
-    try:
-        with open(ITEMS_FILE, 'w') as f:
-            json.dump(mock_db["checklist_items"], f)
-    except:
-        print("Error saving items file")
-
-# Load the database
-mock_db = load_db()
+@app.before_request
+def refresh_store():
+    """Pick up writes from other mock server workers sharing DB_DIR"""
+    store.refresh()
 
 @app.route('/api/suggestions', methods=['POST', 'OPTIONS'])
 def get_suggestions():
@@ -277,13 +239,13 @@ def signup():
         })
     else:
         # Save user to mock database
-        user_id = len(mock_db["users"]) + 1
-        mock_db["users"][email] = {
+        user_id = store.allocate_id("users")
+        store.put("users", email, {
             "id": user_id,
             "name": name,
             "email": email,
             "password": password
-        }
+        })
         print(f"Signup successful: Created user {email}")
         print(f"User database now has {len(mock_db['users'])} users")
         
@@ -314,33 +276,56 @@ def checklists():
         return response
     
     if request.method == 'GET':
-        # Return all checklists
-        checklists_list = list(mock_db["checklists"].values())
+        # Return all checklists, or one user's with ?creator_id=
+        creator_id = request.args.get('creator_id', type=int)
+        if creator_id is not None:
+            checklists_list = store.find("checklists", "creator_id", creator_id)
+        else:
+            checklists_list = list(mock_db["checklists"].values())
         response = jsonify({"checklists": checklists_list})
     else:  # POST
         # Create new checklist
         data = request.get_json()
-        checklist_id = len(mock_db["checklists"]) + 1
+        
+        # Store creator_id as an int so ?creator_id= lookups find it
+        creator_id = data.get('creator_id', 1)
+        if isinstance(creator_id, str) and creator_id.isdigit():
+            creator_id = int(creator_id)
+        if not isinstance(creator_id, int) or isinstance(creator_id, bool):
+            response = jsonify({"success": False, "message": "creator_id must be an integer"})
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            return response, 400
+        
+        checklist_id = store.allocate_id("checklists")
         checklist = {
             "id": checklist_id,
             "title": data.get('title', 'New Checklist'),
             "description": data.get('description', ''),
-            "creator_id": data.get('creator_id', 1)
+            "creator_id": creator_id
         }
-        mock_db["checklists"][checklist_id] = checklist
+        store.put("checklists", checklist_id, checklist)
         response = jsonify({"success": True, "checklist": checklist})
     
     response.headers.add('Access-Control-Allow-Origin', '*')
     return response
 
+@app.route('/api/checklists/<int:checklist_id>', methods=['GET'])
+def get_checklist(checklist_id):
+    """Handle checklist details requests"""
+    checklist = store.get("checklists", checklist_id)
+    if checklist is None:
+        response = jsonify({"success": False, "message": f"Checklist {checklist_id} not found"})
+        response.status_code = 404
+    else:
+        items = store.find("checklist_items", "checklist_id", checklist_id)
+        response = jsonify(dict(checklist, items=items))
+    
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    return response
+
 @app.route('/api/checklist-items/<item_id>', methods=['PUT', 'DELETE', 'OPTIONS'])
 def manage_checklist_item(item_id):
     """Handle update and delete checklist item requests"""
-    global mock_db
-    
-    # Reload DB to ensure it's current
-    mock_db = load_db()
-    
     # Handle preflight request
     if request.method == 'OPTIONS':
         response = jsonify({'status': 'ok'})
@@ -355,28 +340,13 @@ def manage_checklist_item(item_id):
         print(f"DELETING CHECKLIST ITEM: {item_id}")
         print("="*50)
         
-        # Convert ID to both string and integer for lookup
-        str_id = str(item_id)
-        int_id = int(item_id) if str_id.isdigit() else None
-        
-        # Show current items
-        print(f"Current items in DB: {list(mock_db['checklist_items'].keys())}")
-        
-        # Check all possible ID formats
-        found = False
-        for key in [str_id, int_id]:
-            if key is not None and key in mock_db["checklist_items"]:
-                del mock_db["checklist_items"][key]
-                print(f"Successfully deleted item {item_id} (key: {key})")
-                found = True
-                break
-        
-        if not found:
+        # Keys are normalized by the store, so one lookup covers "7" and 7
+        if store.get("checklist_items", item_id) is not None:
+            store.delete("checklist_items", item_id)
+            print(f"Successfully deleted item {item_id}")
+        else:
             print(f"Item {item_id} not found, but returning success anyway")
         
-        # Save updated DB
-        save_db(mock_db)
-        
         # Return success response with proper CORS headers
         result = {"success": True, "message": f"Item {item_id} deleted successfully"}
         response = jsonify(result)
@@ -394,35 +364,25 @@ def manage_checklist_item(item_id):
         data = request.get_json()
         print(f"Update data: {data}")
         
-        # Convert ID to both string and integer for lookup
-        str_id = str(item_id)
-        int_id = int(item_id) if str_id.isdigit() else None
-        
-        # Show current items
-        print(f"Current items in DB: {list(mock_db['checklist_items'].keys())}")
-        
-        # Check all possible ID formats
-        found = False
-        for key in [str_id, int_id]:
-            if key is not None and key in mock_db["checklist_items"]:
-                # Update fields
-                if 'title' in data:
-                    mock_db["checklist_items"][key]["title"] = data["title"]
-                if 'status' in data:
-                    mock_db["checklist_items"][key]["status"] = data["status"]
-                
-                updated_item = mock_db["checklist_items"][key]
-                print(f"Successfully updated item {item_id} (key: {key}): {updated_item}")
-                found = True
-                
-                # Save updated DB
-                save_db(mock_db)
-                
-                result = {"success": True, "message": f"Item {item_id} updated successfully", "item": updated_item}
-                response = jsonify(result)
-                response.headers.add('Access-Control-Allow-Origin', '*')
-                response.headers.add('Content-Type', 'application/json')
-                return response
+        # Keys are normalized by the store, so one lookup covers "7" and 7
+        item = store.get("checklist_items", item_id)
+        if item is not None:
+            # Update fields
+            updated_item = dict(item)
+            if 'title' in data:
+                updated_item["title"] = data["title"]
+            if 'status' in data:
+                updated_item["status"] = data["status"]
+            
+            # Append the new version of the record to the store's log
+            store.put("checklist_items", item_id, updated_item)
+            print(f"Successfully updated item {item_id}: {updated_item}")
+            
+            result = {"success": True, "message": f"Item {item_id} updated successfully", "item": updated_item}
+            response = jsonify(result)
+            response.headers.add('Access-Control-Allow-Origin', '*')
+            response.headers.add('Content-Type', 'application/json')
+            return response
         
         # If we get here, item was not found
         print(f"Item {item_id} not found")
@@ -436,11 +396,6 @@ def manage_checklist_item(item_id):
 @app.route('/api/checklist-items', methods=['POST', 'OPTIONS'])
 def create_checklist_item():
     """Handle create checklist item requests"""
-    global mock_db
-    
-    # Reload DB to ensure it's current
-    mock_db = load_db()
-    
     # Handle preflight request
     if request.method == 'OPTIONS':
         response = jsonify({'status': 'ok'})
@@ -459,39 +414,27 @@ def create_checklist_item():
     print(f"Checklist ID: {data.get('checklist_id', 1)}")
     print("="*50)
     
-    # Generate a new item ID - ensure it's unique among both string and int keys
-    existing_ids = set()
-    for key in mock_db["checklist_items"].keys():
-        try:
-            if isinstance(key, str) and key.isdigit():
-                existing_ids.add(int(key))
-            elif isinstance(key, int):
-                existing_ids.add(key)
-        except:
-            pass
+    # IDs are never reused, even after deletes
+    item_id = store.allocate_id("checklist_items")
     
-    item_id = 1
-    while item_id in existing_ids:
-        item_id += 1
+    # Form posts send the checklist ID as a string; index it as a number
+    checklist_id = data.get('checklist_id', 1)
+    if isinstance(checklist_id, str) and checklist_id.isdigit():
+        checklist_id = int(checklist_id)
     
     # Create the new item
     item = {
         "id": item_id,
         "title": data.get('title', 'New Item'),
-        "checklist_id": data.get('checklist_id', 1),
+        "checklist_id": checklist_id,
         "status": data.get('status', 'To Pack'),
         "completed": False
     }
     
-    # Store in DB as BOTH string and integer key for maximum compatibility
-    mock_db["checklist_items"][item_id] = item
-    mock_db["checklist_items"][str(item_id)] = item
+    store.put("checklist_items", item_id, item)
     
     print(f"Created new item with ID: {item_id} and status: {item['status']}")
-    print(f"Current items in DB: {list(mock_db['checklist_items'].keys())}")
-    
-    # Save updated DB
-    save_db(mock_db)
+    print(f"Items in DB: {len(mock_db['checklist_items'])}")
     
     response = jsonify({"success": True, "item": item})
     response.headers.add('Access-Control-Allow-Origin', '*')
@@ -0,0 +1,520 @@
+import atexit
+import glob
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no advisory locks, so only run a single worker there
+    fcntl = None
+
+# IDs a process reserves at a time from allocate_id(); one log write (and
+# cross-process lock) per block instead of per record
+ID_BLOCK_SIZE = 100
+
+class LogStore:
+    """
+    In-memory tables persisted as snapshot files plus an append-only log.
+
+    Every mutation is applied in memory and appended to a write buffer; a
+    background thread writes the buffer to the current log segment and
+    fsyncs it in batches (group commit), so a request costs one log record
+    instead of rewriting every file. Once the log outgrows
+    compact_after_bytes, the tables are written out as fresh snapshots and
+    older log segments are deleted.
+
+    Several processes can share a directory: writes and compactions hold an
+    exclusive fcntl lock on store.lock, and refresh() picks up what other
+    processes wrote by reading the new end of the log, or by reloading
+    everything if the snapshot was replaced.
+
+    Records can be found by the fields named in indexes with a hash lookup
+    (find()); the indexes are updated whenever a record is put, deleted,
+    loaded or replayed. allocate_id() hands out IDs that are never reused,
+    even after the record holding the highest one is deleted.
+
+    Each table has a key type. Keys are converted to it on every put,
+    delete, get and load, so "7" and 7 are the same record and a lookup is
+    a single probe. Stored records are replaced, never modified in place.
+
+    On disk:
+        <table>.jsonl            Snapshot of a table, one {"key", "value"}
+                                 JSON object per line, so keys keep their type
+        snapshot.json            {"log_segment": n, "next_ids": {...}}:
+                                 snapshots include every segment before n
+        wal-<n>.log              JSON lines: {"op", "table", "key", "value"},
+                                 or {"op": "reserve", "table", "upto"} for IDs
+        store.lock               Lock file for the processes sharing the store
+
+    Writes acknowledged within the last flush_interval seconds can be lost
+    if the process crashes; call flush() when that matters.
+    """
+
+    def __init__(self, directory, key_types, indexes=None, legacy_files=None,
+                 flush_interval=0.05, compact_after_bytes=4 * 1024 * 1024):
+        """
+        Args:
+            directory (str): Directory holding snapshots and log segments
+            key_types (dict): Table name -> key type (int or str)
+            indexes (dict): Table name -> record fields to index
+            legacy_files (dict): Table name -> JSON object file (the old
+                format, keyed by strings) to load while a table has no
+                .jsonl snapshot yet
+            flush_interval (float): Seconds between batched log writes
+            compact_after_bytes (int): Log size that triggers a compaction
+        """
+        self.directory = directory
+        self.key_types = key_types
+        self.legacy_files = legacy_files or {}
+        self.flush_interval = flush_interval
+        self.compact_after_bytes = compact_after_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self.tables = {table: {} for table in key_types}
+        # Table -> field -> value -> {key: None}, an insertion-ordered set
+        self.indexes = {
+            table: {field: {} for field in fields}
+            for table, fields in (indexes or {}).items()
+        }
+        # Table -> lowest ID no process has used or reserved
+        self._next_ids = {}
+        # Table -> [next, end) of the block this process reserved
+        self._id_blocks = {}
+        # Guards the tables and the write buffer
+        self._lock = threading.RLock()
+        # Serializes file access between threads; the fcntl lock only
+        # excludes other processes
+        self._io_lock = threading.Lock()
+        self._lock_file = open(os.path.join(directory, 'store.lock'), 'a')
+        self._pending = []
+        self._wakeup = threading.Event()
+        self._closed = False
+
+        self._log = None
+        with self._io_lock, self._file_lock(exclusive=False):
+            self._reload()
+
+        self._flusher = threading.Thread(target=self._run_flusher, name='mock-store-flusher', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # Files
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"wal-{segment}.log")
+
+    def _snapshot_path(self):
+        return os.path.join(self.directory, 'snapshot.json')
+
+    def _table_path(self, table):
+        return os.path.join(self.directory, f"{table}.jsonl")
+
+    def _segments(self):
+        """Get the numbers of the log segments on disk, oldest first"""
+        segments = []
+        for path in glob.glob(os.path.join(self.directory, 'wal-*.log')):
+            try:
+                segments.append(int(os.path.basename(path)[4:-4]))
+            except ValueError:
+                pass
+        return sorted(segments)
+
+    def _file_id(self, path):
+        """Identify a version of a file; changes whenever it is replaced"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def _log_end(self):
+        try:
+            return os.stat(self._segment_path(self._segment)).st_size
+        except OSError:
+            return 0
+
+    @contextmanager
+    def _file_lock(self, exclusive):
+        """Hold the advisory lock shared with other processes using the directory"""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_json(self, path, default):
+        if not os.path.exists(path):
+            return default
+        with open(path) as f:
+            try:
+                return json.load(f)
+            except ValueError as e:
+                # Snapshots are replaced atomically, so this is not a torn
+                # write; refuse to start rather than lose the table
+                raise ValueError(f"Corrupt snapshot file {path}: {e}")
+
+    def _write_atomic(self, path, write):
+        """Replace a file so readers see either the old or the new contents"""
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _write_json_atomic(self, path, data):
+        self._write_atomic(path, lambda f: json.dump(data, f))
+
+    def _write_table_atomic(self, table, records):
+        def write(f):
+            for key, value in records:
+                f.write(json.dumps({"key": key, "value": value}))
+                f.write('\n')
+        self._write_atomic(self._table_path(table), write)
+
+    def _load_table(self, table):
+        """
+        Read a table's snapshot line by line, or its legacy JSON file if it
+        has not been compacted since the upgrade.
+
+        Returns:
+            dict: Canonical key -> record
+        """
+        records = {}
+        path = self._table_path(table)
+        if os.path.exists(path):
+            with open(path) as f:
+                for number, line in enumerate(f, 1):
+                    try:
+                        entry = json.loads(line)
+                    except ValueError as e:
+                        raise ValueError(f"Corrupt snapshot file {path} at line {number}: {e}")
+                    records[self._key(table, entry['key'], strict=False)] = entry['value']
+            return records
+
+        if table in self.legacy_files:
+            legacy = self._read_json(os.path.join(self.directory, self.legacy_files[table]), {})
+            # JSON object keys are always strings; the old server also stored
+            # some items under both "7" and 7, which collapse into one here
+            for key, value in legacy.items():
+                records[self._key(table, key, strict=False)] = value
+        return records
+
+    def _key(self, table, key, strict=True):
+        """
+        Convert a key to its table's key type.
+
+        Args:
+            strict (bool): Raise ValueError for keys that cannot be
+                converted, instead of keeping them as they are
+        """
+        key_type = self.key_types.get(table)
+        if key_type is None or isinstance(key, key_type) and not isinstance(key, bool):
+            return key
+        try:
+            return key_type(key)
+        except (TypeError, ValueError):
+            if strict:
+                raise ValueError(f"Invalid {table} key: {key!r}")
+            return key
+
+    def _fsync_directory(self):
+        """Make renames in the directory durable"""
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            # Directories cannot be opened on Windows
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # Loading (callers hold the io lock and the file lock)
+
+    def _reload(self):
+        """Rebuild the tables from the snapshots and the log"""
+        self._snapshot_id = self._file_id(self._snapshot_path())
+        meta = self._read_json(self._snapshot_path(), {})
+        first_segment = meta.get('log_segment', 0)
+        segments = [segment for segment in self._segments() if segment >= first_segment]
+
+        with self._lock:
+            for table in list(self.tables):
+                self.tables[table] = {}
+            for table in self.key_types:
+                self.tables[table] = self._load_table(table)
+
+            self._next_ids = dict(meta.get('next_ids', {}))
+            for table, records in self.tables.items():
+                for value in records.values():
+                    self._see_id(table, value)
+            self._rebuild_indexes()
+
+            for segment in segments[:-1]:
+                self._read_log(segment, 0)
+            self._segment = segments[-1] if segments else first_segment
+            self._offset = self._read_log(self._segment, 0)
+
+            # Unwritten local changes still win over what is on disk
+            for record, _ in self._pending:
+                self._apply(record)
+
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self._segment_path(self._segment), 'ab')
+
+    def _read_log(self, segment, offset):
+        """
+        Apply the complete records of a log segment after a byte offset.
+
+        Returns:
+            int: Offset just past the last record applied
+        """
+        path = self._segment_path(segment)
+        if not os.path.exists(path):
+            return offset
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partly written record: still being written, or torn
+                    # by a crash (the next writer truncates it)
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(record)
+                offset += len(line)
+        return offset
+
+    def _catch_up(self):
+        """Apply what other processes wrote since we last looked"""
+        if self._file_id(self._snapshot_path()) != self._snapshot_id:
+            # Another process compacted: our segment may be gone
+            self._reload()
+            return
+        with self._lock:
+            self._offset = self._read_log(self._segment, self._offset)
+            for record, _ in self._pending:
+                self._apply(record)
+
+    def _apply(self, record):
+        name = record['table']
+        if record['op'] == 'reserve':
+            self._next_ids[name] = max(self._next_ids.get(name, 1), record['upto'])
+            return
+
+        table = self.tables.setdefault(name, {})
+        # Logs written before keys were typed may hold "7" for 7
+        key = self._key(name, record['key'], strict=False)
+        old = table.pop(key, None)
+        if old is not None:
+            self._unindex(name, key, old)
+        if record['op'] == 'put':
+            table[key] = record['value']
+            self._index(name, key, record['value'])
+            self._see_id(name, record['value'])
+
+    def _see_id(self, table, value):
+        """Keep the ID allocator ahead of IDs assigned outside allocate_id()"""
+        if isinstance(value, dict) and isinstance(value.get('id'), int):
+            if value['id'] >= self._next_ids.get(table, 1):
+                self._next_ids[table] = value['id'] + 1
+
+    # Secondary indexes (callers hold the lock)
+
+    def _index(self, table, key, value):
+        for field, entries in self.indexes.get(table, {}).items():
+            if isinstance(value, dict) and value.get(field) is not None:
+                entries.setdefault(value[field], {})[key] = None
+
+    def _unindex(self, table, key, value):
+        for field, entries in self.indexes.get(table, {}).items():
+            if isinstance(value, dict) and value.get(field) is not None:
+                keys = entries.get(value[field])
+                if keys is not None:
+                    keys.pop(key, None)
+                    if not keys:
+                        del entries[value[field]]
+
+    def _rebuild_indexes(self):
+        for table, fields in self.indexes.items():
+            for field in fields:
+                fields[field] = {}
+            for key, value in self.tables.get(table, {}).items():
+                self._index(table, key, value)
+
+    def find(self, table, field, value):
+        """
+        Get the records of a table whose indexed field equals a value.
+
+        Returns:
+            list: Matching records in the order they were last written
+                (updating a record moves it to the end)
+        """
+        with self._lock:
+            keys = self.indexes[table][field].get(value, {})
+            records = self.tables[table]
+            return [records[key] for key in keys]
+
+    def refresh(self):
+        """
+        Pick up changes written by other processes sharing the directory.
+        Only stats the snapshot and the log when nothing changed, so it is
+        cheap enough to call before every request.
+        """
+        if (self._file_id(self._snapshot_path()) == self._snapshot_id
+                and self._log_end() <= self._offset):
+            return
+        with self._io_lock, self._file_lock(exclusive=False):
+            self._catch_up()
+
+    # Mutations
+
+    def get(self, table, key):
+        """
+        Look up a record by key, e.g. an ID taken from a URL.
+
+        Returns:
+            The record, or None if there is none or the key is not valid
+            for the table
+        """
+        try:
+            key = self._key(table, key)
+        except ValueError:
+            return None
+        return self.tables[table].get(key)
+
+    def put(self, table, key, value):
+        """Insert or replace a record"""
+        self._record({"op": "put", "table": table, "key": self._key(table, key), "value": value})
+
+    def delete(self, table, key):
+        """Delete a record if it exists"""
+        try:
+            key = self._key(table, key)
+        except ValueError:
+            return
+        self._record({"op": "delete", "table": table, "key": key})
+
+    def allocate_id(self, table):
+        """
+        Get a new ID for a record of a table. IDs are never handed out
+        twice, across restarts and across processes sharing the directory.
+
+        Returns:
+            int: The ID
+        """
+        with self._lock:
+            block = self._id_blocks.get(table)
+            if block and block[0] < block[1]:
+                block[0] += 1
+                return block[0] - 1
+
+        # Reserve the next block in the log, under the cross-process lock
+        with self._io_lock, self._file_lock(exclusive=True):
+            self._catch_up()
+            with self._lock:
+                start = self._next_ids.get(table, 1)
+                record = {"op": "reserve", "table": table, "upto": start + ID_BLOCK_SIZE}
+                self._apply(record)
+                self._pending.append((record, (json.dumps(record) + '\n').encode()))
+                self._id_blocks[table] = [start + 1, start + ID_BLOCK_SIZE]
+            self._append_pending()
+        return start
+
+    def _record(self, record):
+        line = json.dumps(record) + '\n'
+        with self._lock:
+            self._apply(record)
+            self._pending.append((record, line.encode()))
+        self._wakeup.set()
+
+    # Background flushing and compaction
+
+    def _run_flusher(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+                if self._offset >= self.compact_after_bytes:
+                    self.compact()
+            except OSError as e:
+                print(f"Error writing mock store log: {e}")
+
+    def flush(self):
+        """Write and fsync every buffered mutation"""
+        with self._io_lock:
+            if not self._pending:
+                return
+            with self._file_lock(exclusive=True):
+                self._catch_up()
+                self._append_pending()
+
+    def _append_pending(self):
+        """Append the write buffer to the log (io lock and exclusive file lock held)"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        if self._log_end() > self._offset:
+            # We have read everything complete, so the rest is a record torn
+            # by a crashed writer; appending after it would corrupt ours
+            os.ftruncate(self._log.fileno(), self._offset)
+
+        data = b''.join(line for _, line in pending)
+        self._log.write(data)
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._offset += len(data)
+
+    def compact(self):
+        """Write fresh snapshots of every table and drop the log they cover"""
+        with self._io_lock, self._file_lock(exclusive=True):
+            # Make the log match memory, so the snapshots cover it exactly
+            self._catch_up()
+            self._append_pending()
+            with self._lock:
+                # Records are replaced rather than modified, so copying the
+                # (key, record) pairs is enough
+                snapshot = {table: list(records.items()) for table, records in self.tables.items()}
+                next_ids = dict(self._next_ids)
+
+            # A crash before snapshot.json is replaced is harmless: the old
+            # log replays to the same state over old or new table files
+            next_segment = self._segment + 1
+            for table in self.key_types:
+                self._write_table_atomic(table, snapshot.get(table, []))
+            self._write_json_atomic(self._snapshot_path(), {"log_segment": next_segment, "next_ids": next_ids})
+            self._fsync_directory()
+            self._snapshot_id = self._file_id(self._snapshot_path())
+
+            self._log.close()
+            self._segment = next_segment
+            self._log = open(self._segment_path(self._segment), 'ab')
+            self._offset = 0
+
+            for segment in self._segments():
+                if segment < self._segment:
+                    os.remove(self._segment_path(segment))
+
+    def close(self):
+        """Flush outstanding writes and stop the background thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+        self._log.close()
+        self._lock_file.close()
@@ -1,19 +1,48 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
 from werkzeug.security import generate_password_hash, check_password_hash
 
 db = SQLAlchemy()
 
+def normalize_title(title):
+    """Fold case and whitespace so "Tent", "tent " and "TENT" compare equal"""
+    return ' '.join(title.split()).casefold() if title is not None else None
+
+def normalize_email(email):
+    """Fold case and surrounding spaces so "John@X.com " and "john@x.com" compare equal"""
+    return email.strip().lower() if email is not None else None
+
 class User(db.Model):
     __tablename__ = 'users'
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
+    # normalize_title(name), kept in sync by set_name; the member picker
+    # searches and pages on it (see utils/directory.py)
+    name_normalized = db.Column(db.String(100))
     email = db.Column(db.String(120), unique=True, nullable=False)
+    # normalize_email(email), kept in sync by set_email, for prefix search
+    email_normalized = db.Column(db.String(120))
     password_hash = db.Column(db.String(255), nullable=False)
     role = db.Column(db.String(20), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('ix_users_name_normalized', 'name_normalized', 'id'),
+        db.Index('ix_users_email_normalized', 'email_normalized'),
+    )
+    
+    @validates('name')
+    def set_name(self, key, name):
+        self.name_normalized = normalize_title(name)
+        return name
+    
+    @validates('email')
+    def set_email(self, key, email):
+        self.email_normalized = normalize_email(email)
+        return email
+    
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
         
@@ -27,17 +56,40 @@ class Checklist(db.Model):
     name = db.Column(db.String(100), nullable=False)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by every write to the checklist, its items, members and alerts;
+    # ETags are derived from it (see utils/etag.py)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
     
     # Relationships
+    creator = db.relationship('User', foreign_keys=[created_by])
     items = db.relationship('ChecklistItem', backref='checklist', lazy=True, cascade="all, delete-orphan")
     team_members = db.relationship('TeamMember', backref='checklist', lazy=True, cascade="all, delete-orphan")
     alerts = db.relationship('Alert', backref='checklist', lazy=True, cascade="all, delete-orphan")
+    stats = db.relationship('ChecklistStats', uselist=False, lazy=True, cascade="all, delete-orphan")
+    alert_rollups = db.relationship('AlertRollup', lazy=True, cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        db.Index('ix_checklists_created_by', 'created_by'),
+    )
+
+class ChecklistStats(db.Model):
+    """Item counts per status, kept up to date by every item write (see utils/stats.py)"""
+    __tablename__ = 'checklist_stats'
+    
+    checklist_id = db.Column(db.Integer, db.ForeignKey('checklists.id', ondelete='CASCADE'), primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    to_pack = db.Column(db.Integer, nullable=False, default=0)
+    packed = db.Column(db.Integer, nullable=False, default=0)
+    delivered = db.Column(db.Integer, nullable=False, default=0)
 
 class ChecklistItem(db.Model):
     __tablename__ = 'checklist_items'
     
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
+    # normalize_title(title), kept in sync by set_title; conflict checks
+    # compare on it (see utils/conflicts.py)
+    title_normalized = db.Column(db.String(100))
     status = db.Column(db.String(20), default='To Pack')  # To Pack, Packed, Delivered
     checklist_id = db.Column(db.Integer, db.ForeignKey('checklists.id'), nullable=False)
     assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -45,6 +97,16 @@ class ChecklistItem(db.Model):
     
     # Relationship with User
     assignee = db.relationship('User', foreign_keys=[assigned_to], backref='assigned_items')
+    
+    __table_args__ = (
+        db.Index('ix_checklist_items_checklist_status', 'checklist_id', 'status'),
+        db.Index('ix_checklist_items_conflict', 'checklist_id', 'title_normalized', 'assigned_to'),
+    )
+    
+    @validates('title')
+    def set_title(self, key, title):
+        self.title_normalized = normalize_title(title)
+        return title
 
 class TeamMember(db.Model):
     __tablename__ = 'team_members'
@@ -59,6 +121,7 @@ class TeamMember(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('checklist_id', 'user_id', name='unique_team_member'),
+        db.Index('ix_team_members_user_id', 'user_id'),
     )
 
 class Alert(db.Model):
@@ -68,4 +131,21 @@ class Alert(db.Model):
     type = db.Column(db.String(20), nullable=False)  # conflict, update
     message = db.Column(db.String(255), nullable=False)
     checklist_id = db.Column(db.Integer, db.ForeignKey('checklists.id'), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow) 
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Newest-first listings scan this index backwards; (created_at, id) is
+    # the keyset pagination cursor. The retention job finds expired alerts
+    # of each type with ix_alerts_type_created.
+    __table_args__ = (
+        db.Index('ix_alerts_checklist_created_id', 'checklist_id', 'created_at', 'id'),
+        db.Index('ix_alerts_type_created', 'type', 'created_at'),
+    )
+
+class AlertRollup(db.Model):
+    """Daily per-checklist alert counts kept after the alerts expire (see utils/retention.py)"""
+    __tablename__ = 'alert_rollups'
+    
+    checklist_id = db.Column(db.Integer, db.ForeignKey('checklists.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    type = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
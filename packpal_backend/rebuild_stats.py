@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+from sqlalchemy import create_engine
+import pymysql
+
+# Use PyMySQL instead of MySQLdb
+pymysql.install_as_MySQLdb()
+
+from migrate import DEFAULT_DATABASE_URL
+from utils.stats import find_drift, rebuild_stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Check the per-checklist item counters against the items table and rebuild them"
+    )
+    parser.add_argument(
+        '--database-url',
+        default=os.getenv('DATABASE_URL', DEFAULT_DATABASE_URL),
+        help="SQLAlchemy URL of the database (defaults to $DATABASE_URL or the app's SQLite database)"
+    )
+    parser.add_argument('--check', action='store_true', help="Only report checklists whose counters are wrong")
+    parser.add_argument('--all', action='store_true', help="Rebuild every checklist, not just the drifted ones")
+    args = parser.parse_args(argv)
+
+    engine = create_engine(args.database_url)
+    try:
+        with engine.begin() as connection:
+            drifted = find_drift(connection)
+            for row in drifted:
+                print(
+                    f"checklist {row.checklist_id}: stored "
+                    f"{row.stored_total}/{row.stored_to_pack}/{row.stored_packed}/{row.stored_delivered}, "
+                    f"counted {row.total}/{row.to_pack}/{row.packed}/{row.delivered} "
+                    f"(total/to pack/packed/delivered)"
+                )
+            print(f"{len(drifted)} checklist(s) with wrong counters")
+
+            if args.check:
+                return 1 if drifted else 0
+
+            if args.all:
+                rebuild_stats(connection)
+                print("Rebuilt counters for all checklists")
+            elif drifted:
+                rebuild_stats(connection, [row.checklist_id for row in drifted])
+                print(f"Rebuilt counters for {len(drifted)} checklist(s)")
+    except Exception as e:
+        print(f"Error rebuilding stats: {e}")
+        return 1
+    finally:
+        engine.dispose()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+from sqlalchemy import create_engine
+import pymysql
+
+# Use PyMySQL instead of MySQLdb
+pymysql.install_as_MySQLdb()
+
+from migrate import DEFAULT_DATABASE_URL
+from utils.retention import purge_expired_alerts, configured_ttls, parse_ttls, DEFAULT_BATCH_SIZE
+
+# Same default the scheduled job in app.py uses
+current_dir = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ARCHIVE_DIR = os.path.join(current_dir, 'instance', 'alert_archive')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Delete expired alerts, rolling update alerts up into daily counts and archiving them"
+    )
+    parser.add_argument(
+        '--database-url',
+        default=os.getenv('DATABASE_URL', DEFAULT_DATABASE_URL),
+        help="SQLAlchemy URL of the database (defaults to $DATABASE_URL or the app's SQLite database)"
+    )
+    parser.add_argument(
+        '--ttl',
+        help="Days to keep each alert type, e.g. update=30,conflict=90 (defaults to $ALERT_TTL_DAYS or those values)"
+    )
+    parser.add_argument(
+        '--archive-dir',
+        default=os.getenv('ALERT_ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR),
+        help="Directory for the gzipped JSON Lines archives of deleted alerts"
+    )
+    parser.add_argument('--no-archive', action='store_true', help="Delete expired alerts without archiving them")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Alerts deleted per transaction")
+    parser.add_argument('--pause', type=float, default=0.0, help="Seconds to wait between batches")
+    args = parser.parse_args(argv)
+
+    try:
+        ttls = parse_ttls(args.ttl) if args.ttl else configured_ttls()
+    except ValueError as e:
+        parser.error(str(e))
+
+    engine = create_engine(args.database_url)
+    try:
+        deleted = purge_expired_alerts(
+            engine,
+            ttls=ttls,
+            archive_dir=None if args.no_archive else args.archive_dir,
+            batch_size=args.batch_size,
+            pause=args.pause
+        )
+        print(f"Deleted {sum(deleted.values())} alert(s)")
+    except Exception as e:
+        print(f"Error purging alerts: {e}")
+        return 1
+    finally:
+        engine.dispose()
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,37 +5,54 @@ import os
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from models import db, Alert, Checklist, TeamMember
-from utils.auth import role_required
+from models import db, Alert, Checklist
+from utils.access import checklist_access_required, accessible_checklist_ids_query
+from utils.pagination import parse_page_args, page_and_cursor
+from utils.etag import checklist_etag, user_checklists_etag, is_not_modified, not_modified, with_etag
 
 alerts_bp = Blueprint('alerts', __name__)
 
+def paginate_alerts(query):
+    """
+    Apply ?before=<created_at,id>&limit= keyset pagination to an alerts query.
+
+    Returns:
+        tuple: (alerts of this page, next_cursor or None on the last page)
+
+    Raises:
+        ValueError: If the pagination arguments are invalid
+    """
+    before, limit = parse_page_args(request.args)
+    
+    if before:
+        created_at, alert_id = before
+        query = query.filter(db.or_(
+            Alert.created_at < created_at,
+            db.and_(Alert.created_at == created_at, Alert.id < alert_id)
+        ))
+    
+    # Fetch one extra row to know whether there is another page
+    alerts = query.order_by(Alert.created_at.desc(), Alert.id.desc()) \
+                  .limit(limit + 1) \
+                  .all()
+    
+    return page_and_cursor(alerts, limit, lambda a: a.created_at, lambda a: a.id)
+
 @alerts_bp.route('/<int:checklist_id>', methods=['GET'])
 @jwt_required()
+@checklist_access_required
 def get_checklist_alerts(checklist_id):
-    """Get all alerts for a specific checklist"""
-    user_id = get_jwt_identity()
-    
-    # Check if checklist exists
-    checklist = Checklist.query.get(checklist_id)
-    if not checklist:
+    """Get alerts for a specific checklist, most recent first, one page at a time"""
+    etag = checklist_etag(checklist_id, ('alerts', sorted(request.args.items(multi=True))))
+    if not etag:
         return jsonify({"error": "Checklist not found"}), 404
+    if is_not_modified(etag):
+        return not_modified(etag)
     
-    # Check if user has access to this checklist
-    is_team_member = TeamMember.query.filter_by(
-        checklist_id=checklist_id, 
-        user_id=user_id
-    ).first() is not None
-    
-    is_creator = checklist.created_by == user_id
-    
-    if not (is_team_member or is_creator):
-        return jsonify({"error": "You don't have access to this checklist"}), 403
-    
-    # Get alerts, ordered by most recent first
-    alerts = Alert.query.filter_by(checklist_id=checklist_id) \
-                       .order_by(Alert.created_at.desc()) \
-                       .all()
+    try:
+        alerts, next_cursor = paginate_alerts(Alert.query.filter_by(checklist_id=checklist_id))
+    except ValueError:
+        return jsonify({"error": "Invalid pagination parameters"}), 400
     
     # Format response
     result = []
@@ -47,7 +64,7 @@ def get_checklist_alerts(checklist_id):
             "created_at": alert.created_at.isoformat()
         })
     
-    return jsonify(result), 200
+    return with_etag(jsonify({"alerts": result, "next_cursor": next_cursor}), etag), 200
 
 @alerts_bp.route('/', methods=['GET'])
 @jwt_required()
@@ -55,44 +72,44 @@ def get_all_alerts():
     """Get all alerts for the checklists accessible to the user"""
     user_id = get_jwt_identity()
     
-    # Get all checklists the user has access to
-    owned_checklists = Checklist.query.filter_by(created_by=user_id).all()
-    team_memberships = TeamMember.query.filter_by(user_id=user_id).all()
-    
-    checklist_ids = [c.id for c in owned_checklists]
-    for membership in team_memberships:
-        if membership.checklist_id not in checklist_ids:
-            checklist_ids.append(membership.checklist_id)
+    # Alerts only change together with their checklist's version
+    etag = user_checklists_etag(user_id, ('alerts', sorted(request.args.items(multi=True))))
+    if is_not_modified(etag):
+        return not_modified(etag)
     
-    # If user has no checklists, return empty list
-    if not checklist_ids:
-        return jsonify([]), 200
+    # One query: alerts joined to their checklist's name, limited to the
+    # checklists the user created or is a member of
+    query = db.session.query(
+        Alert.id,
+        Alert.type,
+        Alert.message,
+        Alert.checklist_id,
+        Alert.created_at,
+        Checklist.name.label('checklist_name')
+    ).join(Checklist, Alert.checklist_id == Checklist.id) \
+     .filter(Alert.checklist_id.in_(accessible_checklist_ids_query(user_id)))
     
     # Get alerts for these checklists, ordered by most recent first
-    alerts = Alert.query.filter(Alert.checklist_id.in_(checklist_ids)) \
-                       .order_by(Alert.created_at.desc()) \
-                       .limit(50) \
-                       .all()
+    try:
+        alerts, next_cursor = paginate_alerts(query)
+    except ValueError:
+        return jsonify({"error": "Invalid pagination parameters"}), 400
     
     # Format response
     result = []
     for alert in alerts:
-        # Get checklist name
-        checklist = Checklist.query.get(alert.checklist_id)
-        checklist_name = checklist.name if checklist else "Unknown Checklist"
-        
         result.append({
             "id": alert.id,
             "type": alert.type,
             "message": alert.message,
             "checklist": {
                 "id": alert.checklist_id,
-                "name": checklist_name
+                "name": alert.checklist_name
             },
             "created_at": alert.created_at.isoformat()
         })
     
-    return jsonify(result), 200
+    return with_etag(jsonify({"alerts": result, "next_cursor": next_cursor}), etag), 200
 
 # Note: We don't need a POST endpoint for alerts since they are created
 # internally in the application based on user actions 
\ No newline at end of file
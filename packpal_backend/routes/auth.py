@@ -1,11 +1,12 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 import sys
 import os
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models import db, User
+from utils.auth import role_claims, get_current_user as get_authenticated_user
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -20,6 +21,11 @@ def signup():
         if field not in data:
             return jsonify({"error": f"Missing required field: {field}"}), 400
     
+    # Name and email are normalized for search, which needs strings
+    for field in ['name', 'email', 'role']:
+        if not isinstance(data[field], str):
+            return jsonify({"error": f"{field.capitalize()} must be a string"}), 400
+    
     # Check if email already exists
     if User.query.filter_by(email=data['email']).first():
         return jsonify({"error": "Email already registered"}), 400
@@ -42,7 +48,7 @@ def signup():
     db.session.commit()
     
     # Generate access token
-    access_token = create_access_token(identity=user.id)
+    access_token = create_access_token(identity=user.id, additional_claims=role_claims(user))
     
     return jsonify({
         "message": "User created successfully",
@@ -72,7 +78,7 @@ def login():
         return jsonify({"error": "Invalid credentials"}), 401
     
     # Generate access token
-    access_token = create_access_token(identity=user.id)
+    access_token = create_access_token(identity=user.id, additional_claims=role_claims(user))
     
     return jsonify({
         "access_token": access_token,
@@ -88,8 +94,7 @@ def login():
 @jwt_required()
 def get_current_user():
     """Get the current authenticated user"""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_authenticated_user()
     
     if not user:
         return jsonify({"error": "User not found"}), 404
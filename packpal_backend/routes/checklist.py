@@ -1,13 +1,20 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import func
+from datetime import datetime
 import sys
 import os
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from models import db, Checklist, ChecklistItem, TeamMember, Alert, User
-from utils.auth import role_required
+from models import db, Checklist, ChecklistItem, ChecklistStats, TeamMember, User, normalize_title
+from utils.auth import role_required, get_current_user
+from utils.access import checklist_access_required, can_access, invalidate_user_access, invalidate_checklist_access
+from utils.queries import accessible_checklists_with_stats, load_checklist_detail, DETAIL_FIELDS
+from utils.events import publish_checklist_event
+from utils.alert_writer import emit_alert
+from utils.conflicts import assignment_conflict_exists, duplicate_assignments
+from utils.stats import record_item_changes, change_item_statuses, delete_items, ensure_stats, load_stats, ConcurrentItemChange
+from utils.etag import bump_checklist_version, checklist_etag, is_not_modified, not_modified, with_etag
 
 checklist_bp = Blueprint('checklist', __name__)
 
@@ -16,51 +23,37 @@ checklist_bp = Blueprint('checklist', __name__)
 def get_checklists():
     """Get all checklists accessible to the current user"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     
     if not user:
         return jsonify({"error": "User not found"}), 404
     
-    # If user is owner or admin, get all checklists created by them
-    if user.role in ['owner', 'admin']:
-        # Get checklists created by the user
-        own_checklists = Checklist.query.filter_by(created_by=user_id).all()
-        # Get checklists where the user is a team member
-        team_memberships = TeamMember.query.filter_by(user_id=user_id).all()
-        team_checklist_ids = [tm.checklist_id for tm in team_memberships]
-        team_checklists = Checklist.query.filter(Checklist.id.in_(team_checklist_ids)).all()
-        # Combine lists without duplicates
-        checklists = list(set(own_checklists + team_checklists))
-    else:
-        # For regular members and viewers, only get checklists they're part of
-        team_memberships = TeamMember.query.filter_by(user_id=user_id).all()
-        checklist_ids = [tm.checklist_id for tm in team_memberships]
-        checklists = Checklist.query.filter(Checklist.id.in_(checklist_ids)).all()
+    # Owners and admins also see checklists they created; everyone sees the
+    # checklists they are a team member of. Counts come from the same query.
+    include_owned = user.role in ['owner', 'admin']
+    rows = accessible_checklists_with_stats(user_id, include_owned=include_owned)
+    
+    # Checklists older than the stats table get their counters once
+    missing_stats = [row.id for row in rows if row.total is None]
+    if missing_stats:
+        ensure_stats(missing_stats)
+        rows = accessible_checklists_with_stats(user_id, include_owned=include_owned)
     
     # Format response
     result = []
-    for checklist in checklists:
-        # Get creator name
-        creator = User.query.get(checklist.created_by)
-        creator_name = creator.name if creator else "Unknown"
-        
-        # Count items by status
-        total_items = ChecklistItem.query.filter_by(checklist_id=checklist.id).count()
-        packed_count = ChecklistItem.query.filter_by(checklist_id=checklist.id, status='Packed').count()
-        delivered_count = ChecklistItem.query.filter_by(checklist_id=checklist.id, status='Delivered').count()
-        
+    for row in rows:
         result.append({
-            "id": checklist.id,
-            "name": checklist.name,
+            "id": row.id,
+            "name": row.name,
             "created_by": {
-                "id": checklist.created_by,
-                "name": creator_name
+                "id": row.created_by,
+                "name": row.creator_name or "Unknown"
             },
-            "created_at": checklist.created_at.isoformat(),
+            "created_at": row.created_at.isoformat(),
             "stats": {
-                "total": total_items,
-                "packed": packed_count,
-                "delivered": delivered_count
+                "total": row.total,
+                "packed": row.packed,
+                "delivered": row.delivered
             }
         })
     
@@ -83,6 +76,7 @@ def create_checklist():
         name=data['name'],
         created_by=user_id
     )
+    checklist.stats = ChecklistStats()
     
     db.session.add(checklist)
     db.session.commit()
@@ -94,9 +88,10 @@ def create_checklist():
     )
     db.session.add(team_member)
     db.session.commit()
+    invalidate_user_access(user_id)
     
     # Get creator name
-    creator = User.query.get(user_id)
+    creator = get_current_user()
     
     return jsonify({
         "id": checklist.id,
@@ -110,80 +105,72 @@ def create_checklist():
 
 @checklist_bp.route('/<int:checklist_id>', methods=['GET'])
 @jwt_required()
+@checklist_access_required
 def get_checklist_details(checklist_id):
     """Get details of a specific checklist with items and members"""
-    user_id = get_jwt_identity()
+    # Optional projection, e.g. ?fields=items to skip loading members
+    fields = DETAIL_FIELDS
+    if request.args.get('fields'):
+        fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        invalid = [f for f in fields if f not in DETAIL_FIELDS]
+        if invalid:
+            return jsonify({"error": f"Invalid fields: {', '.join(invalid)}. Must be any of: {', '.join(DETAIL_FIELDS)}"}), 400
+    
+    # Answer unchanged re-fetches before loading items and members
+    etag = checklist_etag(checklist_id, ('detail', sorted(set(fields))))
+    if not etag:
+        return jsonify({"error": "Checklist not found"}), 404
+    if is_not_modified(etag):
+        return not_modified(etag)
     
-    # Check if checklist exists
-    checklist = Checklist.query.get(checklist_id)
+    # Check if checklist exists (creator, items and members are eager-loaded)
+    checklist = load_checklist_detail(checklist_id, fields)
     if not checklist:
         return jsonify({"error": "Checklist not found"}), 404
     
-    # Check if user has access to this checklist
-    is_team_member = TeamMember.query.filter_by(
-        checklist_id=checklist_id, 
-        user_id=user_id
-    ).first() is not None
-    
-    is_creator = checklist.created_by == user_id
-    
-    if not (is_team_member or is_creator):
-        return jsonify({"error": "You don't have access to this checklist"}), 403
-    
-    # Get all items for this checklist
-    items = ChecklistItem.query.filter_by(checklist_id=checklist_id).all()
-    items_data = []
-    
-    for item in items:
-        assignee = None
-        if item.assigned_to:
-            user = User.query.get(item.assigned_to)
-            if user:
-                assignee = {
-                    "id": user.id,
-                    "name": user.name
-                }
-        
-        items_data.append({
-            "id": item.id,
-            "title": item.title,
-            "status": item.status,
-            "assigned_to": assignee,
-            "created_at": item.created_at.isoformat()
-        })
-    
-    # Get team members
-    team_members = TeamMember.query.filter_by(checklist_id=checklist_id).all()
-    members_data = []
-    
-    for member in team_members:
-        user = User.query.get(member.user_id)
-        if user:
-            members_data.append({
-                "id": user.id,
-                "name": user.name,
-                "email": user.email,
-                "role": user.role
-            })
-    
-    # Get creator info
-    creator = User.query.get(checklist.created_by)
-    creator_name = creator.name if creator else "Unknown"
-    
     # Format response
     response = {
         "id": checklist.id,
         "name": checklist.name,
         "created_by": {
             "id": checklist.created_by,
-            "name": creator_name
+            "name": checklist.creator.name if checklist.creator else "Unknown"
         },
-        "created_at": checklist.created_at.isoformat(),
-        "items": items_data,
-        "members": members_data
+        "created_at": checklist.created_at.isoformat()
     }
     
-    return jsonify(response), 200
+    if 'items' in fields:
+        items_data = []
+        for item in checklist.items:
+            assignee = None
+            if item.assignee:
+                assignee = {
+                    "id": item.assignee.id,
+                    "name": item.assignee.name
+                }
+            
+            items_data.append({
+                "id": item.id,
+                "title": item.title,
+                "status": item.status,
+                "assigned_to": assignee,
+                "created_at": item.created_at.isoformat()
+            })
+        response["items"] = items_data
+    
+    if 'members' in fields:
+        members_data = []
+        for member in checklist.team_members:
+            if member.user:
+                members_data.append({
+                    "id": member.user.id,
+                    "name": member.user.name,
+                    "email": member.user.email,
+                    "role": member.user.role
+                })
+        response["members"] = members_data
+    
+    return with_etag(jsonify(response), etag), 200
 
 @checklist_bp.route('/<int:checklist_id>', methods=['PUT'])
 @jwt_required()
@@ -203,6 +190,7 @@ def update_checklist(checklist_id):
     
     # Update checklist
     checklist.name = data['name']
+    bump_checklist_version(checklist_id)
     db.session.commit()
     
     return jsonify({
@@ -222,10 +210,16 @@ def delete_checklist(checklist_id):
     if not checklist:
         return jsonify({"error": "Checklist not found"}), 404
     
+    # Users whose cached access lists include this checklist
+    affected_user_ids = {member.user_id for member in checklist.team_members} | {checklist.created_by}
+    
     # Delete checklist (cascade will handle related items, members, and alerts)
     db.session.delete(checklist)
     db.session.commit()
     
+    invalidate_checklist_access(affected_user_ids)
+    publish_checklist_event(checklist_id, 'checklist_deleted', {"id": checklist_id})
+    
     return jsonify({"message": "Checklist deleted successfully"}), 200
 
 @checklist_bp.route('/<int:checklist_id>/items', methods=['POST'])
@@ -239,6 +233,10 @@ def add_item(checklist_id):
     if not data.get('title'):
         return jsonify({"error": "Item title is required"}), 400
     
+    # Titles are normalized for conflict checks, which needs a string
+    if not isinstance(data['title'], str):
+        return jsonify({"error": "Item title must be a string"}), 400
+    
     # Check if checklist exists
     checklist = Checklist.query.get(checklist_id)
     if not checklist:
@@ -269,6 +267,8 @@ def add_item(checklist_id):
         item.assigned_to = data['assigned_to']
     
     db.session.add(item)
+    record_item_changes(checklist_id, added=[item.status])
+    bump_checklist_version(checklist_id)
     db.session.commit()
     
     # Format assignee data
@@ -281,21 +281,24 @@ def add_item(checklist_id):
                 "name": user.name
             }
     
-    return jsonify({
+    item_data = {
         "id": item.id,
         "title": item.title,
         "status": item.status,
         "checklist_id": item.checklist_id,
         "assigned_to": assignee,
         "created_at": item.created_at.isoformat()
-    }), 201
+    }
+    publish_checklist_event(checklist_id, 'item_created', item_data)
+    
+    return jsonify(item_data), 201
 
 @checklist_bp.route('/items/<int:item_id>', methods=['PUT'])
 @jwt_required()
 def update_item(item_id):
     """Update an item's status or assignment"""
     user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = get_current_user()
     data = request.get_json()
     
     # Check if item exists
@@ -304,16 +307,11 @@ def update_item(item_id):
         return jsonify({"error": "Item not found"}), 404
     
     # Check if user has access to this checklist
-    is_team_member = TeamMember.query.filter_by(
-        checklist_id=item.checklist_id, 
-        user_id=user_id
-    ).first() is not None
-    
-    if not is_team_member:
+    if not can_access(user_id, item.checklist_id):
         return jsonify({"error": "You don't have access to this checklist"}), 403
     
-    # Get the checklist for alert creation
-    checklist = Checklist.query.get(item.checklist_id)
+    # Alerts (type, message) to record once the change is committed
+    new_alerts = []
     
     # Handle status updates
     if data.get('status'):
@@ -326,29 +324,34 @@ def update_item(item_id):
         if user.role in ['member', 'viewer']:
             if item.assigned_to != user_id:
                 # Create an alert for this unauthorized attempt
-                alert = Alert(
-                    type='conflict',
-                    message=f"{user.name} attempted to mark '{item.title}' as {data['status']} but was not assigned to it",
-                    checklist_id=item.checklist_id
-                )
-                db.session.add(alert)
+                new_alerts.append((
+                    'conflict',
+                    f"{user.name} attempted to mark '{item.title}' as {data['status']} but was not assigned to it"
+                ))
                 
-                # Only allow if user is assigned to this item
+                # Only allow if user is assigned to this item; a refused
+                # attempt is still recorded
                 if user.role == 'viewer':
+                    emit_alert(*new_alerts[0], item.checklist_id)
                     return jsonify({"error": "Viewers cannot update item status"}), 403
                 elif user.role == 'member' and item.assigned_to is not None and item.assigned_to != user_id:
+                    emit_alert(*new_alerts[0], item.checklist_id)
                     return jsonify({"error": "You can only update items assigned to you"}), 403
         
         old_status = item.status
-        item.status = data['status']
+        if old_status != data['status']:
+            # Guarded UPDATE; a concurrent identical change is counted once
+            try:
+                change_item_statuses(item.checklist_id, {item.id: data['status']})
+            except ConcurrentItemChange:
+                db.session.rollback()
+                return jsonify({"error": "Item was changed by another request, please retry"}), 409
         
         # Create an alert for status change
-        alert = Alert(
-            type='update',
-            message=f"{user.name} changed '{item.title}' status from '{old_status}' to '{data['status']}'",
-            checklist_id=item.checklist_id
-        )
-        db.session.add(alert)
+        new_alerts.append((
+            'update',
+            f"{user.name} changed '{item.title}' status from '{old_status}' to '{data['status']}'"
+        ))
     
     # Handle assignment updates (owner/admin only)
     if data.get('assigned_to') is not None and user.role in ['owner', 'admin']:
@@ -369,27 +372,22 @@ def update_item(item_id):
             if not is_team_member:
                 return jsonify({"error": "User is not a member of this checklist"}), 400
             
-            # Check for conflicting assignment
-            existing_items = ChecklistItem.query.filter_by(
-                checklist_id=item.checklist_id,
-                title=item.title,
-                assigned_to=data['assigned_to']
-            ).all()
-            
-            if existing_items and item.id not in [i.id for i in existing_items]:
+            # Check for conflicting assignment: another item with the same
+            # title already assigned to this user (one indexed EXISTS probe)
+            if item.assigned_to != data['assigned_to'] and assignment_conflict_exists(
+                item.checklist_id, item.title, data['assigned_to'], exclude_item_id=item.id
+            ):
                 # Create conflict alert
-                existing_assignee = User.query.get(item.assigned_to) if item.assigned_to else None
-                new_assignee = User.query.get(data['assigned_to'])
+                existing_assignee = item.assignee
                 
-                alert = Alert(
-                    type='conflict',
-                    message=f"Potential conflict: '{item.title}' assigned to both {existing_assignee.name if existing_assignee else 'nobody'} and {new_assignee.name}",
-                    checklist_id=item.checklist_id
-                )
-                db.session.add(alert)
+                new_alerts.append((
+                    'conflict',
+                    f"Potential conflict: '{item.title}' assigned to both {existing_assignee.name if existing_assignee else 'nobody'} and {assigned_user.name}"
+                ))
             
             item.assigned_to = data['assigned_to']
     
+    bump_checklist_version(item.checklist_id)
     db.session.commit()
     
     # Format assignee data
@@ -402,14 +400,21 @@ def update_item(item_id):
                 "name": assigned_user.name
             }
     
-    return jsonify({
+    item_data = {
         "id": item.id,
         "title": item.title,
         "status": item.status,
         "checklist_id": item.checklist_id,
         "assigned_to": assignee,
         "created_at": item.created_at.isoformat()
-    }), 200
+    }
+    publish_checklist_event(item.checklist_id, 'item_updated', item_data)
+    
+    # Written (and streamed) by the alert writer, outside this request
+    for alert_type, message in new_alerts:
+        emit_alert(alert_type, message, item.checklist_id)
+    
+    return jsonify(item_data), 200
 
 @checklist_bp.route('/items/<int:item_id>', methods=['DELETE'])
 @jwt_required()
@@ -421,54 +426,328 @@ def delete_item(item_id):
     if not item:
         return jsonify({"error": "Item not found"}), 404
     
-    db.session.delete(item)
+    checklist_id = item.checklist_id
+    try:
+        deleted = delete_items(checklist_id, [item_id])
+    except ConcurrentItemChange:
+        db.session.rollback()
+        return jsonify({"error": "Item was changed by another request, please retry"}), 409
+    if not deleted:
+        # Deleted by another request since it was loaded
+        return jsonify({"error": "Item not found"}), 404
+    bump_checklist_version(checklist_id)
     db.session.commit()
+    publish_checklist_event(checklist_id, 'item_deleted', {"id": item_id, "checklist_id": checklist_id})
     
     return jsonify({"message": "Item deleted successfully"}), 200
 
-@checklist_bp.route('/<int:checklist_id>/progress', methods=['GET'])
-@jwt_required()
-def get_progress(checklist_id):
-    """Get progress statistics for a checklist"""
+# Upper bound on operations accepted by the bulk item endpoints
+MAX_BATCH_OPERATIONS = 1000
+
+def apply_item_operations(checklist_id, user_id, operations):
+    """
+    Validate and apply a batch of item operations in a single transaction.
+    
+    Uses a constant number of queries however large the batch is: one for
+    the checklist, one for the referenced items, one IN (...) lookup for the
+    assignees involved, one assignee membership query and one conflict query.
+    
+    Args:
+        checklist_id (int): ID of the checklist the items belong to
+        user_id (int): ID of the user performing the operations
+        operations (list): Dicts with an "op" of create, update or delete
+    
+    Returns:
+        tuple: (response body, HTTP status code)
+    """
+    if not isinstance(operations, list) or not operations:
+        return {"error": "A non-empty list of operations is required"}, 400
+    
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return {"error": f"At most {MAX_BATCH_OPERATIONS} operations are allowed per request"}, 400
+    
+    valid_statuses = ['To Pack', 'Packed', 'Delivered']
+    
+    # Validate the shape of every operation before touching the database
+    creates, updates, delete_ids = [], [], set()
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            return {"error": f"Operation {index} must be an object"}, 400
+        
+        # assigned_to is a user id or null; anything else would fail the
+        # assignee lookups or be written into the foreign key as is
+        assigned_to = operation.get('assigned_to')
+        if assigned_to is not None and (not isinstance(assigned_to, int) or isinstance(assigned_to, bool)):
+            return {"error": f"Operation {index}: assigned_to must be a user id or null"}, 400
+        
+        op = operation.get('op')
+        if op == 'create':
+            if not isinstance(operation.get('title'), str) or not operation['title'].strip():
+                return {"error": f"Operation {index}: item title is required"}, 400
+            creates.append(operation)
+        elif op in ['update', 'delete']:
+            if not isinstance(operation.get('id'), int):
+                return {"error": f"Operation {index}: item id is required"}, 400
+            if op == 'update':
+                if operation.get('status') and operation['status'] not in valid_statuses:
+                    return {"error": f"Operation {index}: invalid status. Must be one of: {', '.join(valid_statuses)}"}, 400
+                updates.append(operation)
+            else:
+                delete_ids.add(operation['id'])
+        else:
+            return {"error": f"Operation {index}: op must be one of: create, update, delete"}, 400
+    
+    update_ids = {operation['id'] for operation in updates}
+    if len(update_ids) != len(updates) or update_ids & delete_ids:
+        return {"error": "Each item may appear in only one operation per batch"}, 400
+    
     # Check if checklist exists
     checklist = Checklist.query.get(checklist_id)
     if not checklist:
-        return jsonify({"error": "Checklist not found"}), 404
+        return {"error": "Checklist not found"}, 404
+    
+    # Load every referenced item in one query
+    items = {}
+    if update_ids or delete_ids:
+        items = {
+            item.id: item
+            for item in ChecklistItem.query.filter(
+                ChecklistItem.checklist_id == checklist_id,
+                ChecklistItem.id.in_(update_ids | delete_ids)
+            ).all()
+        }
+        missing = sorted((update_ids | delete_ids) - set(items))
+        if missing:
+            return {"error": f"Items not found in this checklist: {', '.join(map(str, missing))}"}, 404
     
-    # Check if user has access
-    user_id = get_jwt_identity()
-    is_team_member = TeamMember.query.filter_by(
-        checklist_id=checklist_id, 
-        user_id=user_id
-    ).first() is not None
+    user = get_current_user()
+    if not user:
+        return {"error": "User not found"}, 404
     
-    is_creator = checklist.created_by == user_id
+    # One lookup for the new assignees and current assignees
+    new_assignee_ids = {
+        operation['assigned_to'] for operation in creates + updates
+        if operation.get('assigned_to') is not None
+    }
+    current_assignee_ids = {items[item_id].assigned_to for item_id in update_ids if items[item_id].assigned_to}
+    users = {}
+    if new_assignee_ids | current_assignee_ids:
+        users = {
+            assignee.id: assignee
+            for assignee in User.query.filter(User.id.in_(new_assignee_ids | current_assignee_ids)).all()
+        }
     
-    if not (is_team_member or is_creator):
-        return jsonify({"error": "You don't have access to this checklist"}), 403
+    if not can_access(user_id, checklist_id):
+        return {"error": "You don't have access to this checklist"}, 403
+    
+    # One membership query for every new assignee
+    member_ids = set()
+    if new_assignee_ids:
+        member_ids = {
+            row.user_id
+            for row in db.session.query(TeamMember.user_id).filter(
+                TeamMember.checklist_id == checklist_id,
+                TeamMember.user_id.in_(new_assignee_ids)
+            ).all()
+        }
     
-    # Count items by status
-    total_items = ChecklistItem.query.filter_by(checklist_id=checklist_id).count()
+    can_manage = user.role in ['owner', 'admin']
+    if (creates or delete_ids) and not can_manage:
+        return {"error": "Insufficient permissions"}, 403
+    
+    # Assignments are only applied for owners/admins, as in update_item
+    applied_assignee_ids = new_assignee_ids if can_manage else set()
+    for assignee_id in sorted(applied_assignee_ids):
+        if assignee_id not in users:
+            return {"error": f"Assigned user {assignee_id} not found"}, 404
+        if assignee_id not in member_ids:
+            return {"error": f"User {assignee_id} is not a member of this checklist"}, 400
+    
+    # Items holding each (normalized title, assignee) pair, for conflict
+    # detection in one query; kept up to date as the batch is applied
+    title_holders = {}
+    reassigned = [
+        operation for operation in updates
+        if can_manage and operation.get('assigned_to') is not None
+        and operation['assigned_to'] != items[operation['id']].assigned_to
+    ]
+    if reassigned:
+        for holder in db.session.query(
+            ChecklistItem.id, ChecklistItem.title_normalized, ChecklistItem.assigned_to
+        ).filter(
+            ChecklistItem.checklist_id == checklist_id,
+            ChecklistItem.title_normalized.in_({normalize_title(items[operation['id']].title) for operation in reassigned}),
+            ChecklistItem.assigned_to.in_({operation['assigned_to'] for operation in reassigned})
+        ).all():
+            title_holders.setdefault((holder.title_normalized, holder.assigned_to), set()).add(holder.id)
+    
+    now = datetime.utcnow()
+    alerts = []
+    update_rows = []
+    updated = []
+    
+    for operation in updates:
+        item = items[operation['id']]
+        row = {"id": item.id}
+        status = item.status
+        assigned_to = item.assigned_to
+        
+        if operation.get('status'):
+            if user.role in ['member', 'viewer'] and item.assigned_to != user_id:
+                if user.role == 'viewer':
+                    return {"error": "Viewers cannot update item status"}, 403
+                if item.assigned_to is not None:
+                    return {"error": f"You can only update items assigned to you (item {item.id})"}, 403
+                alerts.append((
+                    'conflict',
+                    f"{user.name} attempted to mark '{item.title}' as {operation['status']} but was not assigned to it"
+                ))
+            
+            if operation['status'] != item.status:
+                status = row["status"] = operation['status']
+                alerts.append((
+                    'update',
+                    f"{user.name} changed '{item.title}' status from '{item.status}' to '{operation['status']}'"
+                ))
+        
+        if can_manage and 'assigned_to' in operation:
+            new_assignee_id = operation['assigned_to']
+            if new_assignee_id != item.assigned_to:
+                title = normalize_title(item.title)
+                # Another item (not this one) with the same title already
+                # assigned to the new assignee, before or earlier in this batch
+                if new_assignee_id is not None and title_holders.get((title, new_assignee_id), set()) - {item.id}:
+                    existing_assignee = users.get(item.assigned_to)
+                    alerts.append((
+                        'conflict',
+                        f"Potential conflict: '{item.title}' assigned to both {existing_assignee.name if existing_assignee else 'nobody'} and {users[new_assignee_id].name}"
+                    ))
+                title_holders.get((title, item.assigned_to), set()).discard(item.id)
+                title_holders.setdefault((title, new_assignee_id), set()).add(item.id)
+            assigned_to = row["assigned_to"] = new_assignee_id
+        
+        if len(row) > 1:
+            update_rows.append(row)
+        updated.append({
+            "id": item.id,
+            "title": item.title,
+            "status": status,
+            "assigned_to": assigned_to,
+            "created_at": item.created_at
+        })
+    
+    create_rows = [{
+        "title": operation['title'],
+        # bulk_insert_mappings skips the model's title validator
+        "title_normalized": normalize_title(operation['title']),
+        "checklist_id": checklist_id,
+        "status": 'To Pack',
+        "assigned_to": operation.get('assigned_to'),
+        "created_at": now
+    } for operation in creates]
+    
+    # Apply everything in one transaction. Status changes and deletes use
+    # guarded statements so the counters only count what actually changed
+    try:
+        if create_rows:
+            db.session.bulk_insert_mappings(ChecklistItem, create_rows, return_defaults=True)
+            record_item_changes(checklist_id, added=[row['status'] for row in create_rows])
+        status_changes = {row['id']: row.pop('status') for row in update_rows if 'status' in row}
+        if status_changes:
+            change_item_statuses(checklist_id, status_changes)
+        assignment_rows = [row for row in update_rows if len(row) > 1]
+        if assignment_rows:
+            db.session.bulk_update_mappings(ChecklistItem, assignment_rows)
+        if delete_ids:
+            delete_items(checklist_id, delete_ids)
+    except ConcurrentItemChange:
+        db.session.rollback()
+        return {"error": "Items were changed by another request, please retry"}, 409
+    bump_checklist_version(checklist_id)
+    db.session.commit()
+    
+    def format_item(row):
+        assignee = users.get(row['assigned_to']) if row['assigned_to'] else None
+        return {
+            "id": row['id'],
+            "title": row['title'],
+            "status": row['status'],
+            "checklist_id": checklist_id,
+            "assigned_to": {"id": assignee.id, "name": assignee.name} if assignee else None,
+            "created_at": row['created_at'].isoformat()
+        }
+    
+    result = {
+        "created": [format_item(row) for row in create_rows],
+        "updated": [format_item(row) for row in updated],
+        "deleted": sorted(delete_ids)
+    }
+    publish_checklist_event(checklist_id, 'items_batch', result)
+    
+    # Written (and streamed) by the alert writer in multi-row batches
+    for alert_type, message in alerts:
+        emit_alert(alert_type, message, checklist_id)
+    
+    return result, 200
+
+@checklist_bp.route('/<int:checklist_id>/items:batch', methods=['POST'])
+@jwt_required()
+def batch_items(checklist_id):
+    """Create, update and delete many items of a checklist in one request"""
+    data = request.get_json() or {}
+    body, status = apply_item_operations(checklist_id, get_jwt_identity(), data.get('operations'))
+    return jsonify(body), status
+
+@checklist_bp.route('/<int:checklist_id>/items', methods=['PATCH'])
+@jwt_required()
+def bulk_update_items(checklist_id):
+    """Update the status or assignment of many items of a checklist at once"""
+    data = request.get_json() or {}
+    items = data.get('items')
+    if not isinstance(items, list):
+        return jsonify({"error": "A list of items is required"}), 400
+    
+    operations = [dict(item, op='update') if isinstance(item, dict) else item for item in items]
+    body, status = apply_item_operations(checklist_id, get_jwt_identity(), operations)
+    return jsonify(body), status
+
+@checklist_bp.route('/<int:checklist_id>/progress', methods=['GET'])
+@jwt_required()
+@checklist_access_required
+def get_progress(checklist_id):
+    """Get progress statistics for a checklist"""
+    etag = checklist_etag(checklist_id, 'progress')
+    if not etag:
+        return jsonify({"error": "Checklist not found"}), 404
+    if is_not_modified(etag):
+        return not_modified(etag)
+    
+    # Counts are maintained by the item endpoints; this is a primary key lookup
+    stats = load_stats(checklist_id)
+    if not stats:
+        return jsonify({"error": "Checklist not found"}), 404
+    
+    total_items = stats.total
     
     if total_items == 0:
-        return jsonify({
+        return with_etag(jsonify({
             "checklist_id": checklist_id,
             "total_items": 0,
             "to_pack": {"count": 0, "percent": 0},
             "packed": {"count": 0, "percent": 0},
             "delivered": {"count": 0, "percent": 0}
-        }), 200
+        }), etag), 200
     
-    to_pack_count = ChecklistItem.query.filter_by(checklist_id=checklist_id, status='To Pack').count()
-    packed_count = ChecklistItem.query.filter_by(checklist_id=checklist_id, status='Packed').count()
-    delivered_count = ChecklistItem.query.filter_by(checklist_id=checklist_id, status='Delivered').count()
+    to_pack_count = stats.to_pack
+    packed_count = stats.packed
+    delivered_count = stats.delivered
     
     # Calculate percentages
     to_pack_percent = round((to_pack_count / total_items) * 100, 1)
     packed_percent = round((packed_count / total_items) * 100, 1)
     delivered_percent = round((delivered_count / total_items) * 100, 1)
     
-    return jsonify({
+    return with_etag(jsonify({
         "checklist_id": checklist_id,
         "total_items": total_items,
         "to_pack": {
@@ -483,4 +762,27 @@ def get_progress(checklist_id):
             "count": delivered_count,
             "percent": delivered_percent
         }
-    }), 200 
\ No newline at end of file
+    }), etag), 200
+
+@checklist_bp.route('/<int:checklist_id>/duplicate-assignments', methods=['GET'])
+@jwt_required()
+@checklist_access_required
+def get_duplicate_assignments(checklist_id):
+    """List items assigned more than once to the same member under the same title"""
+    etag = checklist_etag(checklist_id, 'duplicates')
+    if not etag:
+        return jsonify({"error": "Checklist not found"}), 404
+    if is_not_modified(etag):
+        return not_modified(etag)
+    
+    # One grouped query along ix_checklist_items_conflict
+    duplicates = [{
+        "title": row.title,
+        "assigned_to": {
+            "id": row.assigned_to,
+            "name": row.assignee_name
+        },
+        "count": row.count
+    } for row in duplicate_assignments(checklist_id)]
+    
+    return with_etag(jsonify({"duplicates": duplicates}), etag), 200
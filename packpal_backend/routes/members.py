@@ -1,37 +1,70 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func
 import sys
 import os
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from models import db, TeamMember, User, Checklist, Alert
-from utils.auth import role_required
+from models import db, TeamMember, User, Checklist
+from utils.auth import role_required, get_current_user
+from utils.access import checklist_access_required, invalidate_user_access
+from utils.events import publish_checklist_event
+from utils.alert_writer import emit_alert
+from utils.etag import bump_checklist_version
+from utils.pagination import parse_page_args, page_and_cursor, decode_key_cursor, encode_key_cursor
+from utils.directory import available_users_query
 
 members_bp = Blueprint('members', __name__)
 
-@members_bp.route('/<int:checklist_id>', methods=['GET'])
-@jwt_required()
-def get_members(checklist_id):
-    """Get all members of a checklist"""
-    user_id = get_jwt_identity()
-    
-    # Check if checklist exists
-    checklist = Checklist.query.get(checklist_id)
-    if not checklist:
-        return jsonify({"error": "Checklist not found"}), 404
+# Upper bound on memberships removed by one bulk request
+MAX_BULK_REMOVALS = 1000
+
+def count_owners(checklist_id, excluding_user_ids=()):
+    """
+    Count the members of a checklist whose role is owner, with one joined
+    COUNT over the (checklist_id, user_id) unique index.
     
-    # Check if user has access to this checklist
-    is_team_member = TeamMember.query.filter_by(
-        checklist_id=checklist_id, 
-        user_id=user_id
-    ).first() is not None
+    Args:
+        checklist_id (int): ID of the checklist
+        excluding_user_ids (iterable): Users left out of the count, e.g.
+            the members about to be removed
     
-    is_creator = checklist.created_by == user_id
+    Returns:
+        int: Number of owners
+    """
+    query = db.session.query(func.count(TeamMember.id)).join(
+        User, User.id == TeamMember.user_id
+    ).filter(
+        TeamMember.checklist_id == checklist_id,
+        User.role == 'owner'
+    )
+    excluding_user_ids = set(excluding_user_ids)
+    if excluding_user_ids:
+        query = query.filter(TeamMember.user_id.notin_(excluding_user_ids))
+    return query.scalar()
+
+def would_remove_last_owner(checklist, user_ids):
+    """
+    Check whether removing users from a checklist breaks the last-owner
+    rule: the checklist's creator may only be removed while another member
+    with the owner role stays. Both removal endpoints use this.
     
-    if not (is_team_member or is_creator):
-        return jsonify({"error": "You don't have access to this checklist"}), 403
+    Args:
+        checklist (Checklist): The checklist
+        user_ids (iterable): Users about to be removed
     
+    Returns:
+        bool: True if the removal must be refused
+    """
+    user_ids = set(user_ids)
+    return checklist.created_by in user_ids and count_owners(checklist.id, user_ids) < 1
+
+@members_bp.route('/<int:checklist_id>', methods=['GET'])
+@jwt_required()
+@checklist_access_required
+def get_members(checklist_id):
+    """Get all members of a checklist"""
     # Get team members and their details
     team_members = TeamMember.query.filter_by(checklist_id=checklist_id).all()
     
@@ -54,8 +87,7 @@ def get_members(checklist_id):
 @role_required(['owner', 'admin'])
 def add_member(checklist_id):
     """Add a member to a checklist (owner/admin only)"""
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     data = request.get_json()
     
     # Validate required fields
@@ -89,17 +121,9 @@ def add_member(checklist_id):
     
     db.session.add(team_member)
     
-    # Create an alert for the new member
-    alert = Alert(
-        type='update',
-        message=f"{current_user.name} added {member_user.name} to the checklist",
-        checklist_id=checklist_id
-    )
-    db.session.add(alert)
-    
-    db.session.commit()
-    
-    return jsonify({
+    # Flush first so the id can be read without reloading after commit
+    db.session.flush()
+    member_data = {
         "id": team_member.id,
         "checklist_id": team_member.checklist_id,
         "user": {
@@ -109,15 +133,24 @@ def add_member(checklist_id):
             "role": member_user.role
         },
         "created_at": team_member.created_at.isoformat()
-    }), 201
+    }
+    
+    bump_checklist_version(checklist_id)
+    db.session.commit()
+    invalidate_user_access(member_user.id)
+    publish_checklist_event(checklist_id, 'member_added', member_data)
+    
+    # Create an alert for the new member
+    emit_alert('update', f"{current_user.name} added {member_user.name} to the checklist", checklist_id)
+    
+    return jsonify(member_data), 201
 
 @members_bp.route('/<int:membership_id>', methods=['DELETE'])
 @jwt_required()
 @role_required(['owner', 'admin'])
 def remove_member(membership_id):
     """Remove a member from a checklist (owner/admin only)"""
-    user_id = get_jwt_identity()
-    current_user = User.query.get(user_id)
+    current_user = get_current_user()
     
     # Check if membership exists
     membership = TeamMember.query.get(membership_id)
@@ -132,40 +165,125 @@ def remove_member(membership_id):
         return jsonify({"error": "Associated user or checklist not found"}), 404
     
     # Don't allow removing the checklist owner if they're the only owner
-    if membership.user_id == checklist.created_by:
-        # Check if this is the only owner
-        owner_count = 0
-        members = TeamMember.query.filter_by(checklist_id=membership.checklist_id).all()
-        for member in members:
-            user = User.query.get(member.user_id)
-            if user and user.role == 'owner':
-                owner_count += 1
-        
-        if owner_count <= 1:
-            return jsonify({"error": "Cannot remove the only owner of the checklist"}), 400
+    if would_remove_last_owner(checklist, [membership.user_id]):
+        return jsonify({"error": "Cannot remove the only owner of the checklist"}), 400
     
     # Remove the member
+    checklist_id = membership.checklist_id
     db.session.delete(membership)
     
+    bump_checklist_version(checklist_id)
+    db.session.commit()
+    invalidate_user_access(member_user.id)
+    publish_checklist_event(checklist_id, 'member_removed', {
+        "id": membership_id,
+        "checklist_id": checklist_id,
+        "user_id": member_user.id
+    })
+    
     # Create an alert
-    alert = Alert(
-        type='update',
-        message=f"{current_user.name} removed {member_user.name} from the checklist",
-        checklist_id=membership.checklist_id
-    )
-    db.session.add(alert)
+    emit_alert('update', f"{current_user.name} removed {member_user.name} from the checklist", checklist_id)
+    
+    return jsonify({"message": "Member removed successfully"}), 200
+
+@members_bp.route('/<int:checklist_id>:remove', methods=['POST'])
+@jwt_required()
+@role_required(['owner', 'admin'])
+def remove_members(checklist_id):
+    """
+    Remove many members from a checklist at once (owner/admin only).
+    
+    Takes {"membership_ids": [...]}. The batch is all or nothing: every
+    membership must belong to the checklist, and if it removes the
+    checklist's creator at least one owner must remain among the members
+    that stay. Uses a constant number of queries however large the batch is.
+    """
+    current_user = get_current_user()
+    data = request.get_json() or {}
+    membership_ids = data.get('membership_ids')
+    
+    if not isinstance(membership_ids, list) or not membership_ids \
+            or not all(isinstance(membership_id, int) for membership_id in membership_ids):
+        return jsonify({"error": "A non-empty list of membership IDs is required"}), 400
+    
+    if len(membership_ids) > MAX_BULK_REMOVALS:
+        return jsonify({"error": f"At most {MAX_BULK_REMOVALS} members can be removed per request"}), 400
     
+    checklist = Checklist.query.get(checklist_id)
+    if not checklist:
+        return jsonify({"error": "Checklist not found"}), 404
+    
+    # Memberships and their users in one query
+    rows = db.session.query(TeamMember, User).join(
+        User, User.id == TeamMember.user_id
+    ).filter(
+        TeamMember.checklist_id == checklist_id,
+        TeamMember.id.in_(set(membership_ids))
+    ).all()
+    
+    missing = set(membership_ids) - {membership.id for membership, _ in rows}
+    if missing:
+        return jsonify({"error": f"Memberships not found in this checklist: {sorted(missing)}"}), 404
+    
+    # Same rule as remove_member, checked once for the whole batch
+    if would_remove_last_owner(checklist, [membership.user_id for membership, _ in rows]):
+        return jsonify({"error": "Cannot remove the only owner of the checklist"}), 400
+    
+    # Read what the events need before commit expires the loaded rows
+    removed = [({
+        "id": membership.id,
+        "checklist_id": checklist_id,
+        "user_id": member_user.id
+    }, member_user.name) for membership, member_user in rows]
+    
+    TeamMember.query.filter(
+        TeamMember.id.in_([event["id"] for event, _ in removed])
+    ).delete(synchronize_session=False)
+    
+    bump_checklist_version(checklist_id)
     db.session.commit()
     
-    return jsonify({"message": "Member removed successfully"}), 200
+    for event, member_name in removed:
+        invalidate_user_access(event["user_id"])
+        publish_checklist_event(checklist_id, 'member_removed', event)
+        emit_alert('update', f"{current_user.name} removed {member_name} from the checklist", checklist_id)
+    
+    return jsonify({"removed": [event for event, _ in removed]}), 200
 
 @members_bp.route('/available', methods=['GET'])
 @jwt_required()
 @role_required(['owner', 'admin'])
 def get_available_users():
-    """Get all users that can be added to checklists (for admin selection)"""
-    # Get all users
-    users = User.query.all()
+    """
+    Get users that can be added to checklists (for admin selection), by
+    name, one page at a time.
+    
+    Query parameters: ?q= (prefix of name or email), ?exclude_checklist=
+    (leave out that checklist's members), ?limit= and ?after= (the
+    next_cursor of the previous page).
+    """
+    try:
+        after, limit = parse_page_args(request.args, 'after', decode_key_cursor)
+        exclude_checklist_id = request.args.get('exclude_checklist')
+        if exclude_checklist_id is not None:
+            exclude_checklist_id = int(exclude_checklist_id)
+    except ValueError:
+        return jsonify({"error": "Invalid pagination parameters"}), 400
+    
+    query = available_users_query(request.args.get('q'), exclude_checklist_id)
+    
+    if after:
+        name_key, user_id = after
+        query = query.where(db.or_(
+            User.name_normalized > name_key,
+            db.and_(User.name_normalized == name_key, User.id > user_id)
+        ))
+    
+    # Fetch one extra row to know whether there is another page
+    rows = db.session.execute(query.limit(limit + 1)).all()
+    users, next_cursor = page_and_cursor(
+        rows, limit, lambda row: row.name_normalized, lambda row: row.id, encode_key_cursor
+    )
     
     # Format the response
     result = []
@@ -177,4 +295,4 @@ def get_available_users():
             "role": user.role
         })
     
-    return jsonify(result), 200 
\ No newline at end of file
+    return jsonify({"users": result, "next_cursor": next_cursor}), 200
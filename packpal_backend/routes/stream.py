@@ -0,0 +1,93 @@
+from flask import Blueprint, Response, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import Alert
+from utils.access import checklist_access_required
+from utils.events import bus, format_sse, alert_payload
+
+stream_bp = Blueprint('stream', __name__)
+
+# Send a comment this often so proxies don't close idle streams
+KEEPALIVE_SECONDS = 15
+
+# Most alerts replayed on reconnect; clients further behind get a 'reset' event
+MAX_REPLAY = 500
+
+@stream_bp.route('/<int:checklist_id>', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+@checklist_access_required
+def stream_checklist(checklist_id):
+    """
+    Stream live changes to a checklist as Server-Sent Events.
+
+    Events: 'alert' (with the alert id as event id), 'item_created',
+    'item_updated', 'item_deleted', 'items_batch', 'member_added',
+    'member_removed' and 'checklist_deleted'. Browsers' EventSource cannot
+    set headers, so the token may also be passed as ?jwt=<token>.
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) and get
+    the alerts they missed replayed from the alerts table.
+    """
+    user_id = get_jwt_identity()
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({"error": "Invalid Last-Event-ID"}), 400
+
+    # Subscribe before reading the backlog so nothing committed in between is lost
+    subscription = bus.subscribe(checklist_id)
+
+    backlog = []
+    reset = False
+    if last_event_id is not None:
+        missed = Alert.query.filter(Alert.checklist_id == checklist_id, Alert.id > last_event_id) \
+                            .order_by(Alert.id) \
+                            .limit(MAX_REPLAY + 1) \
+                            .all()
+        reset = len(missed) > MAX_REPLAY
+        backlog = [alert_payload(alert) for alert in missed[-MAX_REPLAY:]]
+
+    # Live alerts already sent as part of the backlog are skipped
+    replayed_up_to = backlog[-1]['id'] if backlog else (last_event_id or 0)
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            if reset:
+                # Too far behind to replay everything; the client should refetch
+                yield format_sse('reset', {"checklist_id": checklist_id})
+            for payload in backlog:
+                yield format_sse('alert', payload, payload['id'])
+
+            while True:
+                message = subscription.get(timeout=KEEPALIVE_SECONDS)
+                if message is None:
+                    if subscription.closed:
+                        # Fell too far behind; the client reconnects and resumes
+                        break
+                    yield ": keepalive\n\n"
+                    continue
+
+                if message['event'] == 'alert' and message['id'] <= replayed_up_to:
+                    continue
+
+                yield format_sse(message['event'], message['data'], message['id'])
+
+                # End the stream once the user can no longer see the checklist
+                if message['event'] == 'checklist_deleted':
+                    break
+                if message['event'] == 'member_removed' and message['data'].get('user_id') == user_id:
+                    break
+        finally:
+            bus.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        # Stop nginx from buffering the stream
+        "X-Accel-Buffering": "no"
+    })
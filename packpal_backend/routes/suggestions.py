@@ -1,7 +1,16 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, current_app
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.suggestions import suggestions_json, suggest_many, merge_suggestions, cache_stats
 
 suggestions_bp = Blueprint('suggestions', __name__)
 
+# Upper bound on trip profiles accepted by the batch endpoint
+MAX_BATCH_TRIPS = 500
+
 @suggestions_bp.route('', methods=['POST'])
 def get_suggestions():
     # Get request data
@@ -13,82 +22,56 @@ def get_suggestions():
     duration_days = int(data.get('duration_days', 0))
     group_size = int(data.get('group_size', 1))
     
-    # Initialize suggestions list
-    suggestions = []
+    # Trip type, destination climate, duration and group size rules come
+    # from the compiled catalog (data/suggestion_catalog.json); identical
+    # trip profiles are served pre-encoded from the cache
+    body = suggestions_json(trip_type, destination, duration_days, group_size, current_app.json.dumps)
     
-    # Trip type based suggestions
-    if trip_type == 'trek':
-        suggestions.extend([
-            {"title": "Tent", "reason": "Essential for overnight stays during trek"},
-            {"title": "Torch", "reason": "Necessary for visibility in dark conditions"},
-            {"title": "First Aid Kit", "reason": "Safety precaution for outdoor activities"},
-            {"title": "Energy Bars", "reason": "Quick nutrition during physical activity"},
-            {"title": "Water Bottle", "reason": "Hydration is crucial during trekking"},
-            {"title": "Hiking Boots", "reason": "Proper footwear for rough terrain"}
-        ])
-    elif trip_type == 'business trip':
-        suggestions.extend([
-            {"title": "Laptop", "reason": "Essential for work and presentations"},
-            {"title": "Formal Wear", "reason": "Professional attire for meetings"},
-            {"title": "ID Cards", "reason": "Required for identification and access"},
-            {"title": "Business Cards", "reason": "Useful for networking"},
-            {"title": "Chargers", "reason": "Keep your devices powered"}
-        ])
-    elif trip_type == 'college fest':
-        suggestions.extend([
-            {"title": "Banners", "reason": "Visual promotion for events"},
-            {"title": "Laptops", "reason": "For presentations and managing events"},
-            {"title": "Extension Cords", "reason": "Power supply for multiple devices"},
-            {"title": "Costumes", "reason": "For performances or themed events"},
-            {"title": "Portable Speakers", "reason": "For music and announcements"}
-        ])
-    elif trip_type == 'hackathon':
-        suggestions.extend([
-            {"title": "Laptop", "reason": "Essential for coding and development"},
-            {"title": "Chargers", "reason": "Keep your devices powered"},
-            {"title": "Power Bank", "reason": "Backup power for mobile devices"},
-            {"title": "Headphones", "reason": "For focus and concentration"},
-            {"title": "Notebook", "reason": "For sketching ideas and taking notes"}
-        ])
+    return Response(body, mimetype='application/json')
+
+@suggestions_bp.route('/batch', methods=['POST'])
+def get_batch_suggestions():
+    """
+    Get suggestions for many trip profiles at once.
     
-    # Weather-based suggestions - simulated weather check
-    rainy_destinations = ['seattle', 'london', 'mumbai', 'vancouver', 'kerala']
-    cold_destinations = ['alaska', 'helsinki', 'toronto', 'moscow', 'oslo']
-    hot_destinations = ['dubai', 'cairo', 'phoenix', 'las vegas', 'chennai']
+    Body: {"trips": [{trip_type, destination, duration_days, group_size}, ...],
+           "merge": false}. Results are returned in input order; with
+    "merge": true a single deduplicated list with per-item counts scaled by
+    group_size is included as well.
+    """
+    data = request.get_json() or {}
+    trips = data.get('trips')
     
-    if any(loc in destination for loc in rainy_destinations):
-        suggestions.extend([
-            {"title": "Raincoat", "reason": "Rainy weather at destination"},
-            {"title": "Umbrella", "reason": "Protection from rain"},
-            {"title": "Waterproof Bag Cover", "reason": "Keep belongings dry"}
-        ])
+    if not isinstance(trips, list) or not trips:
+        return jsonify({"error": "A non-empty list of trips is required"}), 400
     
-    if any(loc in destination for loc in cold_destinations):
-        suggestions.extend([
-            {"title": "Warm Jacket", "reason": "Cold weather at destination"},
-            {"title": "Gloves", "reason": "Protection for hands in cold weather"},
-            {"title": "Thermal Wear", "reason": "Layer clothing for cold climate"}
-        ])
+    if len(trips) > MAX_BATCH_TRIPS:
+        return jsonify({"error": f"At most {MAX_BATCH_TRIPS} trips are allowed per request"}), 400
     
-    if any(loc in destination for loc in hot_destinations):
-        suggestions.extend([
-            {"title": "Sunscreen", "reason": "Protection from sun exposure"},
-            {"title": "Hat", "reason": "Shield from direct sunlight"},
-            {"title": "Sunglasses", "reason": "Eye protection in bright conditions"}
-        ])
+    # Validate every trip before evaluating any
+    parsed = []
+    for index, trip in enumerate(trips):
+        if not isinstance(trip, dict):
+            return jsonify({"error": f"Trip {index} must be an object"}), 400
+        try:
+            parsed.append((
+                str(trip.get('trip_type', '')).lower(),
+                str(trip.get('destination', '')).lower(),
+                int(trip.get('duration_days', 0)),
+                int(trip.get('group_size', 1))
+            ))
+        except (TypeError, ValueError):
+            return jsonify({"error": f"Trip {index}: duration_days and group_size must be integers"}), 400
     
-    # Duration-based suggestions
-    if duration_days > 7:
-        suggestions.extend([
-            {"title": "Laundry Bag", "reason": "Extended stay requires laundry management"},
-            {"title": "Travel Detergent", "reason": "For washing clothes on longer trips"}
-        ])
+    results = suggest_many(parsed)
     
-    # Group size based suggestions
-    if group_size > 5:
-        suggestions.extend([
-            {"title": "Group First Aid Kit", "reason": "Larger group needs more medical supplies"},
-            {"title": "Megaphone", "reason": "Communication in larger groups"}
-        ])
+    response = {"results": [{"suggestions": list(suggestions)} for suggestions in results]}
+    if data.get('merge'):
+        response["merged"] = merge_suggestions(results, [trip[3] for trip in parsed])
     
-    return jsonify({"suggestions": suggestions}) 
\ No newline at end of file
+    return jsonify(response), 200
+
+@suggestions_bp.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Get suggestion cache hit/miss counters"""
+    return jsonify(cache_stats()), 200
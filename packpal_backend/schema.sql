@@ -6,10 +6,14 @@ USE packpal_db;
 CREATE TABLE IF NOT EXISTS users (
     id INT AUTO_INCREMENT PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
+    name_normalized VARCHAR(100),
     email VARCHAR(120) NOT NULL UNIQUE,
+    email_normalized VARCHAR(120),
     password_hash VARCHAR(255) NOT NULL,
     role VARCHAR(20) NOT NULL,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX ix_users_name_normalized (name_normalized, id),
+    INDEX ix_users_email_normalized (email_normalized)
 );
 
 -- Checklists table
@@ -18,19 +22,34 @@ CREATE TABLE IF NOT EXISTS checklists (
     name VARCHAR(100) NOT NULL,
     created_by INT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE CASCADE
+    version INT NOT NULL DEFAULT 1,
+    FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE CASCADE,
+    INDEX ix_checklists_created_by (created_by)
 );
 
 -- Checklist items table
 CREATE TABLE IF NOT EXISTS checklist_items (
     id INT AUTO_INCREMENT PRIMARY KEY,
     title VARCHAR(100) NOT NULL,
+    title_normalized VARCHAR(100),
     status VARCHAR(20) DEFAULT 'To Pack',
     checklist_id INT NOT NULL,
     assigned_to INT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE,
-    FOREIGN KEY (assigned_to) REFERENCES users(id) ON DELETE SET NULL
+    FOREIGN KEY (assigned_to) REFERENCES users(id) ON DELETE SET NULL,
+    INDEX ix_checklist_items_checklist_status (checklist_id, status),
+    INDEX ix_checklist_items_conflict (checklist_id, title_normalized, assigned_to)
+);
+
+-- Per-checklist item counts, maintained by the item endpoints
+CREATE TABLE IF NOT EXISTS checklist_stats (
+    checklist_id INT PRIMARY KEY,
+    total INT NOT NULL DEFAULT 0,
+    to_pack INT NOT NULL DEFAULT 0,
+    packed INT NOT NULL DEFAULT 0,
+    delivered INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE
 );
 
 -- Team members table
@@ -41,7 +60,8 @@ CREATE TABLE IF NOT EXISTS team_members (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE,
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-    UNIQUE KEY unique_team_member (checklist_id, user_id)
+    UNIQUE KEY unique_team_member (checklist_id, user_id),
+    INDEX ix_team_members_user_id (user_id)
 );
 
 -- Alerts table
@@ -51,9 +71,24 @@ CREATE TABLE IF NOT EXISTS alerts (
     message VARCHAR(255) NOT NULL,
     checklist_id INT NOT NULL,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE,
+    INDEX ix_alerts_checklist_created_id (checklist_id, created_at, id),
+    INDEX ix_alerts_type_created (type, created_at)
+);
+
+-- Daily alert counts that outlive the alerts (filled by retention.py)
+CREATE TABLE IF NOT EXISTS alert_rollups (
+    checklist_id INT NOT NULL,
+    day DATE NOT NULL,
+    type VARCHAR(20) NOT NULL,
+    count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (checklist_id, day, type),
     FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE
 );
 
+-- Existing databases created before these indexes were added can be
+-- upgraded in place with: python migrate.py --database-url <url>
+
 -- Sample data for testing
 -- Uncomment the following lines to add sample data
 
@@ -34,10 +34,14 @@ def setup_database():
             CREATE TABLE IF NOT EXISTS users (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 name VARCHAR(100) NOT NULL,
+                name_normalized VARCHAR(100),
                 email VARCHAR(120) NOT NULL UNIQUE,
+                email_normalized VARCHAR(120),
                 password_hash VARCHAR(255) NOT NULL,
                 role VARCHAR(20) DEFAULT 'user',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX ix_users_name_normalized (name_normalized, id),
+                INDEX ix_users_email_normalized (email_normalized)
             )
             """)
             
@@ -48,7 +52,9 @@ def setup_database():
                 name VARCHAR(100) NOT NULL,
                 created_by INT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE CASCADE
+                version INT NOT NULL DEFAULT 1,
+                FOREIGN KEY (created_by) REFERENCES users(id) ON DELETE CASCADE,
+                INDEX ix_checklists_created_by (created_by)
             )
             """)
             
@@ -57,12 +63,27 @@ def setup_database():
             CREATE TABLE IF NOT EXISTS checklist_items (
                 id INT AUTO_INCREMENT PRIMARY KEY,
                 title VARCHAR(100) NOT NULL,
+                title_normalized VARCHAR(100),
                 status VARCHAR(20) DEFAULT 'To Pack',
                 checklist_id INT NOT NULL,
                 assigned_to INT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE,
-                FOREIGN KEY (assigned_to) REFERENCES users(id) ON DELETE SET NULL
+                FOREIGN KEY (assigned_to) REFERENCES users(id) ON DELETE SET NULL,
+                INDEX ix_checklist_items_checklist_status (checklist_id, status),
+                INDEX ix_checklist_items_conflict (checklist_id, title_normalized, assigned_to)
+            )
+            """)
+            
+            # Create checklist stats table - item counts per status
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS checklist_stats (
+                checklist_id INT PRIMARY KEY,
+                total INT NOT NULL DEFAULT 0,
+                to_pack INT NOT NULL DEFAULT 0,
+                packed INT NOT NULL DEFAULT 0,
+                delivered INT NOT NULL DEFAULT 0,
+                FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE
             )
             """)
             
@@ -74,6 +95,20 @@ def setup_database():
                 message VARCHAR(255) NOT NULL,
                 checklist_id INT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE,
+                INDEX ix_alerts_checklist_created_id (checklist_id, created_at, id),
+                INDEX ix_alerts_type_created (type, created_at)
+            )
+            """)
+            
+            # Create alert rollups table (daily counts kept by retention.py)
+            cursor.execute("""
+            CREATE TABLE IF NOT EXISTS alert_rollups (
+                checklist_id INT NOT NULL,
+                day DATE NOT NULL,
+                type VARCHAR(20) NOT NULL,
+                count INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (checklist_id, day, type),
                 FOREIGN KEY (checklist_id) REFERENCES checklists(id) ON DELETE CASCADE
             )
             """)
@@ -87,8 +122,8 @@ def setup_database():
                 # Password 'admin123' - SHA-256 hash
                 password_hash = "a665a45920422f9d417e4867efdc4fb8a04a1f3fff1fa07e998e86f7f7a27ae3"
                 cursor.execute("""
-                INSERT INTO users (name, email, password_hash, role) 
-                VALUES ('Admin', 'admin@packpal.com', %s, 'admin')
+                INSERT INTO users (name, name_normalized, email, email_normalized, password_hash, role) 
+                VALUES ('Admin', 'admin', 'admin@packpal.com', 'admin@packpal.com', %s, 'admin')
                 """, (password_hash,))
                 
                 # Get admin user ID
@@ -119,11 +154,12 @@ def setup_database():
                     ('Medications', 'To Pack')
                 ]
                 
+                # title_normalized as computed by models.normalize_title
                 for item, status in sample_items:
                     cursor.execute("""
-                    INSERT INTO checklist_items (title, status, checklist_id) 
-                    VALUES (%s, %s, %s)
-                    """, (item, status, checklist_id))
+                    INSERT INTO checklist_items (title, title_normalized, status, checklist_id) 
+                    VALUES (%s, %s, %s, %s)
+                    """, (item, ' '.join(item.split()).casefold(), status, checklist_id))
                 
                 # Create welcome alert
                 cursor.execute("""
@@ -4,7 +4,9 @@ import hashlib
 import secrets
 from datetime import datetime, timedelta
 from flask_cors import CORS
+import os
 import time
+from utils.db_pool import ConnectionPool
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
@@ -20,18 +22,18 @@ db_config = {
     'autocommit': True  # Add autocommit to avoid explicit commit calls
 }
 
+# Connection pool shared by all requests; each request reuses one connection
+db_pool = ConnectionPool(db_config, max_size=int(os.getenv('DB_POOL_SIZE', 10)))
+db_pool.init_app(app)
+
 # Simple in-memory token storage 
 # In production, this should use a more robust solution
 active_tokens = {}
 
 def get_db_connection():
-    """Establish database connection"""
-    # Uncomment the original implementation to test real database connection
+    """Get the pooled connection for the current request"""
     try:
-        print("Attempting database connection...")
-        connection = pymysql.connect(**db_config)
-        print("Database connection successful!")
-        return connection
+        return db_pool.get_connection()
     except Exception as e:
         print(f"Database connection error: {e}")
         print("Using mock data instead of database connection")
@@ -39,8 +41,10 @@ def get_db_connection():
 
 def init_database():
     """Initialize database tables if they don't exist"""
-    connection = get_db_connection()
-    if not connection:
+    try:
+        connection = db_pool.acquire()
+    except Exception as e:
+        print(f"Database connection error: {e}")
         print("Failed to connect to database for initialization")
         return False
     
@@ -88,7 +92,7 @@ def init_database():
         print(f"Database initialization error: {e}")
         return False
     finally:
-        connection.close()
+        db_pool.release(connection)
 
 def execute_query(query, params=None, fetch=True):
     """Execute SQL query with error handling"""
@@ -108,8 +112,6 @@ def execute_query(query, params=None, fetch=True):
     except Exception as e:
         print(f"Query execution error: {e}")
         return {"error": str(e)}, 500
-    finally:
-        connection.close()
 
 def hash_password(password):
     """Create SHA-256 hash of the password"""
@@ -137,6 +139,11 @@ def test_db_connection():
         "message": "Database connection successful for testing"
     })
 
+@app.route('/api/db/pool-stats')
+def pool_stats():
+    # Connection pool usage for monitoring
+    return jsonify(db_pool.stats())
+
 # Auth routes
 @app.route('/api/auth/login', methods=['POST'])
 def login():
@@ -182,8 +189,6 @@ def login():
     except Exception as e:
         print(f"Login error: {e}")
         return jsonify({"error": f"Login failed: {str(e)}"}), 500
-    finally:
-        connection.close()
 
 @app.route('/api/auth/signup', methods=['POST', 'OPTIONS'])
 def signup():
@@ -279,8 +284,6 @@ def signup():
     except Exception as e:
         print(f"Signup error: {e}")
         return jsonify({"error": f"Registration failed: {str(e)}"}), 500
-    finally:
-        connection.close()
 
 # Checklist routes
 @app.route('/api/checklists', methods=['GET'])
@@ -0,0 +1,88 @@
+from functools import wraps
+from flask import jsonify
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import union
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db, Checklist, TeamMember
+from utils.cache import TTLCache, MISSING
+
+# Per-user sets of accessible checklist ids (created by or team member of)
+_access_cache = TTLCache(
+    maxsize=int(os.getenv('ACCESS_CACHE_SIZE', 4096)),
+    ttl=float(os.getenv('ACCESS_CACHE_TTL', 60))
+)
+
+def accessible_checklist_ids_query(user_id):
+    """
+    Build a SELECT of the ids of checklists a user created or is a member of.
+    UNION merges the two sources without duplicates; use it as a subquery,
+    e.g. Model.checklist_id.in_(accessible_checklist_ids_query(user_id)).
+    """
+    return union(
+        db.select(Checklist.id).where(Checklist.created_by == user_id),
+        db.select(TeamMember.checklist_id).where(TeamMember.user_id == user_id)
+    )
+
+def _load_accessible_ids(user_id):
+    """Load every checklist id the user created or is a member of in one query"""
+    query = accessible_checklist_ids_query(user_id)
+    ids = frozenset(row[0] for row in db.session.execute(query))
+    _access_cache.set(user_id, ids)
+    return ids
+
+def accessible_checklist_ids(user_id):
+    """
+    Get the ids of all checklists a user can access.
+
+    Returns:
+        frozenset: Checklist ids, served from the cache when possible
+    """
+    ids = _access_cache.get(user_id)
+    if ids is MISSING:
+        ids = _load_accessible_ids(user_id)
+    return ids
+
+def can_access(user_id, checklist_id):
+    """
+    Check whether a user created or is a member of a checklist.
+
+    Grants are answered from the cached set. A denial is re-checked against
+    the database once, so memberships added by another worker process are
+    picked up immediately; removals elsewhere apply within ACCESS_CACHE_TTL.
+    """
+    ids = _access_cache.get(user_id)
+    if ids is not MISSING and checklist_id in ids:
+        return True
+    return checklist_id in _load_accessible_ids(user_id)
+
+def invalidate_user_access(user_id):
+    """Forget a user's cached checklist ids, e.g. after adding or removing a membership"""
+    _access_cache.pop(user_id)
+
+def invalidate_checklist_access(user_ids):
+    """Forget the cached checklist ids of every user who had access to a deleted checklist"""
+    for user_id in user_ids:
+        _access_cache.pop(user_id)
+
+def checklist_access_required(fn):
+    """
+    Decorator for routes with a checklist_id URL parameter that only the
+    checklist's creator and team members may use. Must be applied after
+    @jwt_required().
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        checklist_id = kwargs['checklist_id']
+
+        if not can_access(get_jwt_identity(), checklist_id):
+            # Only the failure path pays for telling 404 and 403 apart
+            if db.session.get(Checklist, checklist_id) is None:
+                return jsonify({"error": "Checklist not found"}), 404
+            return jsonify({"error": "You don't have access to this checklist"}), 403
+
+        return fn(*args, **kwargs)
+    return wrapper
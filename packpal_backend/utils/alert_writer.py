@@ -0,0 +1,279 @@
+import atexit
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db, Alert, Checklist
+from utils.etag import bump_checklist_versions
+from utils.events import publish_alerts
+
+# Queue marker asking the writer thread to exit
+_STOP = object()
+
+# Attempts at a batch that hits a transient error (e.g. SQLite's "database
+# is locked"), and the delay before the first retry; it doubles each time
+WRITE_ATTEMPTS = 5
+RETRY_DELAY = 0.1
+
+class AlertWriter:
+    """
+    Writes alerts from a background thread in batches.
+
+    Routes call emit() once their own transaction has committed. Alerts are
+    queued and the writer thread inserts them with one multi-row INSERT per
+    batch (at most batch_size alerts, or what arrived within interval
+    seconds of the first), bumps the versions of the checklists involved
+    and publishes the alerts to SSE subscribers. When the queue is full the
+    caller writes its alert itself, and the queue is drained when the
+    process exits. Transient database errors are retried with backoff;
+    alerts that still cannot be written after that are logged, so they are
+    delayed rather than silently dropped.
+    """
+
+    def __init__(self, max_queue=10000, batch_size=200, interval=0.05):
+        """
+        Args:
+            max_queue (int): Alerts that can wait for the writer thread
+            batch_size (int): Most alerts written in one INSERT
+            interval (float): Longest an alert waits for its batch to fill
+        """
+        self.batch_size = batch_size
+        self.interval = interval
+        self.app = None
+        self.enabled = True
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._id_step = None
+
+    def init_app(self, app):
+        """
+        Write alerts for an app. Set ASYNC_ALERTS=false to write every alert
+        in the request instead, e.g. for tests that read alerts back at once.
+        """
+        self.app = app
+        self.enabled = os.getenv('ASYNC_ALERTS', 'true').lower() == 'true'
+        atexit.register(self.close)
+
+    def emit(self, type, message, checklist_id):
+        """
+        Record an alert. Its created_at is the time of the call, not of the
+        write, so alert order matches the order of the changes.
+
+        Args:
+            type (str): conflict or update
+            message (str): Alert text
+            checklist_id (int): Checklist the alert belongs to
+        """
+        row = {
+            "type": type,
+            "message": message,
+            "checklist_id": checklist_id,
+            "created_at": datetime.utcnow()
+        }
+
+        if self.app is None or not self.enabled or self._closed:
+            self._write_with_retry([row])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # The writer is behind; don't let the queue grow without bound
+            self._write_with_retry([row])
+
+    def _ensure_started(self):
+        """Start the writer thread on first use, and again in forked workers"""
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='alert-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            row = self._queue.get()
+            if row is _STOP:
+                self._queue.task_done()
+                break
+
+            # Gather the rest of the batch
+            batch = [row]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    row = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if row is _STOP:
+                    self._queue.task_done()
+                    stopping = True
+                    break
+                batch.append(row)
+
+            try:
+                with self.app.app_context():
+                    self._write_with_retry(batch)
+            except Exception as e:
+                self._report_lost(batch, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_with_retry(self, rows):
+        """
+        Write alerts, retrying the batch with exponential backoff while the
+        database reports a transient error. Each attempt is one transaction
+        that either commits or rolls back, so a retry never duplicates rows.
+        """
+        delay = RETRY_DELAY
+        for attempt in range(WRITE_ATTEMPTS):
+            try:
+                self._write(rows)
+                return
+            except OperationalError as e:
+                if attempt == WRITE_ATTEMPTS - 1:
+                    self._report_lost(rows, e)
+                    return
+                time.sleep(delay)
+                delay *= 2
+
+    def _report_lost(self, rows, error):
+        """Log every alert that could not be written, so none vanish silently"""
+        print(f"Error writing {len(rows)} alert(s), giving up: {error}")
+        for row in rows:
+            print(f"Lost alert: checklist {row['checklist_id']} {row['type']} "
+                  f"at {row['created_at'].isoformat()}: {row['message']}")
+
+    def _write(self, rows):
+        """Insert alerts in one transaction, then publish them (needs an app context)"""
+        try:
+            with db.engine.begin() as connection:
+                # Skip alerts of checklists deleted since they were emitted
+                # (SQLite does not enforce the foreign key)
+                checklists = Checklist.__table__
+                existing = set(connection.execute(
+                    checklists.select().with_only_columns(checklists.c.id)
+                    .where(checklists.c.id.in_({row['checklist_id'] for row in rows}))
+                ).scalars())
+                rows = [row for row in rows if row['checklist_id'] in existing]
+                if not rows:
+                    return
+                written = self._insert(connection, rows)
+                bump_checklist_versions(connection, existing)
+        except IntegrityError as e:
+            if len(rows) == 1:
+                # Usually the checklist was deleted after the alert was emitted
+                print(f"Dropping alert for checklist {rows[0]['checklist_id']}: {e}")
+                return
+            # Keep the rest of the batch when one alert cannot be written
+            for row in rows:
+                self._write_with_retry([row])
+            return
+
+        # Same shape as events.alert_payload()
+        publish_alerts([{
+            "id": row['id'],
+            "type": row['type'],
+            "message": row['message'],
+            "checklist_id": row['checklist_id'],
+            "created_at": row['created_at'].isoformat()
+        } for row in sorted(written, key=lambda row: row['id'])])
+
+    def _insert(self, connection, rows):
+        """
+        Insert rows with a single multi-row INSERT. Where the database can
+        return the new rows (SQLite, PostgreSQL, MariaDB) every column is
+        returned, so the rows need not come back in input order. MySQL
+        cannot; there one INSERT ... VALUES (...), (...) is sent and the ids
+        are derived from the first one (LAST_INSERT_ID()), since InnoDB
+        gives the rows of a single multi-row INSERT consecutive ids, spaced
+        by auto_increment_increment.
+
+        Returns:
+            list: Mappings of the written alerts, ids included
+        """
+        alerts = Alert.__table__
+        if connection.dialect.insert_executemany_returning:
+            result = connection.execute(alerts.insert().returning(*alerts.c), rows)
+            return result.mappings().all()
+        if connection.dialect.name == 'mysql':
+            result = connection.execute(alerts.insert().values(rows))
+            if self._id_step is None:
+                self._id_step = connection.execute(text("SELECT @@auto_increment_increment")).scalar()
+            return [dict(row, id=result.lastrowid + index * self._id_step) for index, row in enumerate(rows)]
+        # Other databases without RETURNING: one INSERT per row
+        return [
+            dict(row, id=connection.execute(alerts.insert(), row).inserted_primary_key[0])
+            for row in rows
+        ]
+
+    def flush(self, timeout=None):
+        """
+        Wait until every queued alert has been written.
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.unfinished_tasks == 0
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout=10):
+        """Write everything still queued and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+        # Whatever the thread did not get to (or a parent process's queue
+        # inherited by a fork) is written here
+        leftover = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is not _STOP:
+                leftover.append(row)
+            self._queue.task_done()
+        if leftover and self.app is not None:
+            with self.app.app_context():
+                for start in range(0, len(leftover), self.batch_size):
+                    self._write_with_retry(leftover[start:start + self.batch_size])
+
+# Process-wide writer; create_app() calls init_app()
+alert_writer = AlertWriter(
+    max_queue=int(os.getenv('ALERT_QUEUE_SIZE', 10000)),
+    batch_size=int(os.getenv('ALERT_BATCH_SIZE', 200)),
+    interval=int(os.getenv('ALERT_BATCH_INTERVAL_MS', 50)) / 1000
+)
+
+def emit_alert(type, message, checklist_id):
+    """Record an alert through the process-wide writer (call after commit)"""
+    alert_writer.emit(type, message, checklist_id)
@@ -1,17 +1,76 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask import jsonify, g, current_app, has_app_context
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
 import sys
 import os
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models import User
+from utils.cache import TTLCache, MISSING
+
+class CachedUser:
+    """Read-only snapshot of the user fields request handlers need"""
+
+    __slots__ = ('id', 'name', 'email', 'role')
+
+    def __init__(self, user):
+        self.id = user.id
+        self.name = user.name
+        self.email = user.email
+        self.role = user.role
+
+# Process-wide user cache keyed by user id
+_user_cache = TTLCache(
+    maxsize=int(os.getenv('USER_CACHE_SIZE', 4096)),
+    ttl=float(os.getenv('USER_CACHE_TTL', 60))
+)
+
+def load_user(user_id):
+    """
+    Get a user by id through the process-wide TTL/LRU cache.
+
+    Returns:
+        CachedUser: The user, or None if it does not exist
+    """
+    user = _user_cache.get(user_id)
+    if user is MISSING:
+        db_user = User.query.get(user_id)
+        user = CachedUser(db_user) if db_user else None
+        # Don't cache misses; the user may be created right after
+        if user:
+            _user_cache.set(user_id, user)
+    return user
+
+def invalidate_user(user_id):
+    """Drop a cached user; call whenever the user's name, email or role changes"""
+    _user_cache.pop(user_id)
+    if has_app_context() and g.get('current_user') is not None and g.current_user.id == user_id:
+        g.pop('current_user')
+
+def get_current_user():
+    """
+    Get the authenticated user, resolved at most once per request.
+
+    Returns:
+        CachedUser: The user, or None if the token's user no longer exists
+    """
+    if 'current_user' not in g:
+        g.current_user = load_user(get_jwt_identity())
+    return g.current_user
+
+def role_claims(user):
+    """Extra JWT claims embedding the user's role, for create_access_token(additional_claims=...)"""
+    return {"role": user.role}
 
 def role_required(allowed_roles):
     """
     Decorator for role-based access control.
-    
+
+    With JWT_ROLE_CLAIMS enabled the role is read from the token, so the
+    check needs no database access; role changes then only take effect once
+    the user gets a new token.
+
     Args:
         allowed_roles (list): List of roles allowed to access the endpoint
     """
@@ -19,15 +78,20 @@ def role_required(allowed_roles):
         @wraps(fn)
         def wrapper(*args, **kwargs):
             verify_jwt_in_request()
-            user_id = get_jwt_identity()
-            user = User.query.get(user_id)
-            
-            if not user:
-                return jsonify({"error": "User not found"}), 404
-                
-            if user.role not in allowed_roles:
+
+            role = None
+            if current_app.config.get('JWT_ROLE_CLAIMS'):
+                role = get_jwt().get('role')
+
+            if role is None:
+                user = get_current_user()
+                if not user:
+                    return jsonify({"error": "User not found"}), 404
+                role = user.role
+
+            if role not in allowed_roles:
                 return jsonify({"error": "Insufficient permissions"}), 403
-                
+
             return fn(*args, **kwargs)
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator
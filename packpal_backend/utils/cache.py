@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by TTLCache.get() on a miss, so None can be cached as a value
+MISSING = object()
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after a time-to-live.
+
+    Args:
+        maxsize (int): Maximum number of entries; least recently used entries are evicted first
+        ttl (float): Seconds an entry stays valid, or None to keep entries until evicted
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=MISSING):
+        """Get a cached value, or default if it is missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """Store a value, evicting the least recently used entry if full"""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        """Remove an entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Get hit/miss counters for monitoring"""
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses
+            }
@@ -0,0 +1,79 @@
+from sqlalchemy import select, func, bindparam
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db, ChecklistItem, User, normalize_title
+
+def assignment_conflict_exists(checklist_id, title, assignee_id, exclude_item_id=None):
+    """
+    Check whether another item of a checklist with the same (normalized)
+    title is already assigned to a user. One EXISTS probe of
+    ix_checklist_items_conflict, however many items the checklist has.
+
+    Args:
+        checklist_id (int): The checklist
+        title (str): Title of the item being assigned
+        assignee_id (int): User the item is being assigned to
+        exclude_item_id (int): The item being assigned, which doesn't
+            conflict with itself
+
+    Returns:
+        bool: True if the assignment would duplicate another one
+    """
+    conditions = [
+        ChecklistItem.checklist_id == checklist_id,
+        ChecklistItem.title_normalized == normalize_title(title),
+        ChecklistItem.assigned_to == assignee_id
+    ]
+    if exclude_item_id is not None:
+        conditions.append(ChecklistItem.id != exclude_item_id)
+    return db.session.execute(select(select(ChecklistItem.id).where(*conditions).exists())).scalar()
+
+def duplicate_assignments(checklist_id):
+    """
+    Find every title assigned more than once to the same user in a
+    checklist, with a single GROUP BY over ix_checklist_items_conflict.
+
+    Returns:
+        list: Rows with title (one of the spellings), assigned_to,
+            assignee_name and count, most duplicated first
+    """
+    return db.session.execute(
+        select(
+            func.min(ChecklistItem.title).label('title'),
+            ChecklistItem.assigned_to,
+            User.name.label('assignee_name'),
+            func.count(ChecklistItem.id).label('count')
+        ).join(User, User.id == ChecklistItem.assigned_to)
+         .where(ChecklistItem.checklist_id == checklist_id)
+         .group_by(ChecklistItem.title_normalized, ChecklistItem.assigned_to, User.name)
+         .having(func.count(ChecklistItem.id) > 1)
+         .order_by(func.count(ChecklistItem.id).desc(), func.min(ChecklistItem.title))
+    ).all()
+
+def backfill_normalized_titles(connection, batch_size=1000):
+    """
+    Fill title_normalized for items created before the column existed, in
+    batches by id.
+
+    Args:
+        connection: SQLAlchemy Connection to run the statements on
+    """
+    items = ChecklistItem.__table__
+    update = items.update().where(items.c.id == bindparam('item_id')).values(title_normalized=bindparam('normalized'))
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(items.c.id, items.c.title)
+            .where(items.c.id > last_id, items.c.title_normalized.is_(None))
+            .order_by(items.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        connection.execute(update, [
+            {"item_id": row.id, "normalized": normalize_title(row.title)} for row in rows
+        ])
+        last_id = rows[-1].id
@@ -0,0 +1,269 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from flask import g, has_app_context
+import pymysql
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the acquire timeout"""
+
+class UnitOfWork:
+    """
+    Runs a sequence of statements on one connection inside one transaction.
+    Obtained from ConnectionPool.unit_of_work().
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = connection.cursor()
+
+    def execute(self, query, params=None):
+        """
+        Execute a single statement.
+
+        Returns:
+            int: The generated id for INSERTs into AUTO_INCREMENT tables
+        """
+        self.cursor.execute(query, params)
+        return self.cursor.lastrowid
+
+    def execute_many(self, query, seq_of_params):
+        """
+        Execute a statement for every parameter set. PyMySQL batches
+        INSERT ... VALUES statements into multi-row inserts.
+
+        Returns:
+            int: Number of affected rows
+        """
+        seq_of_params = list(seq_of_params)
+        if not seq_of_params:
+            return 0
+        return self.cursor.executemany(query, seq_of_params)
+
+    def fetchall(self, query, params=None):
+        """Run a query inside the transaction and return all rows"""
+        self.cursor.execute(query, params)
+        return self.cursor.fetchall()
+
+class ConnectionPool:
+    """
+    Thread-safe bounded pool of PyMySQL connections.
+
+    Idle connections are reused most-recently-used first, pinged before reuse
+    when they have been idle for a while, and closed once they exceed the
+    maximum idle time. Inside a Flask request, get_connection() hands out one
+    connection per request and returns it to the pool on teardown.
+    """
+
+    def __init__(self, connect_kwargs, max_size=10, max_idle_seconds=300,
+                 health_check_after=30, acquire_timeout=10, connect=pymysql.connect):
+        """
+        Args:
+            connect_kwargs (dict): Arguments passed to the connect function
+            max_size (int): Maximum number of open connections
+            max_idle_seconds (float): Idle connections older than this are closed
+            health_check_after (float): Ping connections idle for longer than this before reuse
+            acquire_timeout (float): Seconds to wait for a free connection
+            connect (callable): Factory used to open new connections
+        """
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.health_check_after = health_check_after
+        self.acquire_timeout = acquire_timeout
+        self._connect = connect
+
+        self._lock = threading.Condition()
+        self._idle = deque()  # (connection, released_at), oldest on the left
+        self._in_use = 0
+
+        # Counters for stats()
+        self._created = 0
+        self._discarded = 0
+        self._acquired = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _evict_expired(self, now):
+        """Close idle connections past the max idle time (caller holds the lock)"""
+        expired = []
+        while self._idle and now - self._idle[0][1] > self.max_idle_seconds:
+            expired.append(self._idle.popleft()[0])
+        self._discarded += len(expired)
+        return expired
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, connection):
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """
+        Check out a connection, opening a new one if the pool is not full.
+
+        Raises:
+            PoolTimeout: If the pool stays exhausted for acquire_timeout seconds
+        """
+        started = time.monotonic()
+        deadline = started + self.acquire_timeout
+
+        while True:
+            with self._lock:
+                expired = self._evict_expired(time.monotonic())
+
+                waited = False
+                while not self._idle and self._in_use >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No database connection available after {self.acquire_timeout}s")
+                    waited = True
+                    self._lock.wait(remaining)
+
+                if waited:
+                    wait_time = time.monotonic() - started
+                    self._waits += 1
+                    self._total_wait += wait_time
+                    self._max_wait = max(self._max_wait, wait_time)
+
+                entry = self._idle.pop() if self._idle else None
+                self._in_use += 1
+
+            for connection in expired:
+                self._close_quietly(connection)
+
+            if entry is None:
+                try:
+                    connection = self._connect(**self.connect_kwargs)
+                except Exception:
+                    self._release_slot()
+                    raise
+                with self._lock:
+                    self._created += 1
+                    self._acquired += 1
+                return connection
+
+            connection, released_at = entry
+            if time.monotonic() - released_at > self.health_check_after and not self._is_healthy(connection):
+                # Dead connection: drop it and try again with the next one
+                self._close_quietly(connection)
+                self._release_slot(discarded=True)
+                continue
+
+            with self._lock:
+                self._acquired += 1
+            return connection
+
+    def _release_slot(self, discarded=False):
+        with self._lock:
+            self._in_use -= 1
+            if discarded:
+                self._discarded += 1
+            self._lock.notify()
+
+    def release(self, connection, discard=False):
+        """Return a connection to the pool, or close it if it is unusable"""
+        if not discard:
+            try:
+                # End any transaction left open so the next user starts clean
+                connection.rollback()
+            except Exception:
+                discard = True
+
+        if discard:
+            self._close_quietly(connection)
+            self._release_slot(discarded=True)
+            return
+
+        with self._lock:
+            self._in_use -= 1
+            self._idle.append((connection, time.monotonic()))
+            self._lock.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager for using a pooled connection outside of a request"""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    @contextmanager
+    def unit_of_work(self):
+        """
+        Run statements in a single transaction, committing when the block
+        exits and rolling back if it raises. Uses the request's connection
+        when called inside a request.
+
+        Usage:
+            with pool.unit_of_work() as uow:
+                checklist_id = uow.execute("INSERT ...", params)
+                uow.execute_many("INSERT ...", rows)
+        """
+        in_request = has_app_context()
+        connection = self.get_connection() if in_request else self.acquire()
+        uow = UnitOfWork(connection)
+        try:
+            connection.begin()
+            yield uow
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            uow.cursor.close()
+            if not in_request:
+                self.release(connection)
+
+    def get_connection(self):
+        """Get the connection bound to the current request, checking one out on first use"""
+        if not has_app_context():
+            raise RuntimeError("get_connection() needs an app context; use pool.connection() instead")
+
+        connection = g.get('_db_pool_connection')
+        if connection is None:
+            connection = self.acquire()
+            g._db_pool_connection = connection
+        return connection
+
+    def _teardown(self, exception=None):
+        connection = g.pop('_db_pool_connection', None)
+        if connection is not None:
+            self.release(connection)
+
+    def init_app(self, app):
+        """Return request-scoped connections to the pool when the app context ends"""
+        app.teardown_appcontext(self._teardown)
+
+    def stats(self):
+        """Get pool usage counters for monitoring"""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "created": self._created,
+                "discarded": self._discarded,
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "avg_wait_ms": round(self._total_wait / self._waits * 1000, 2) if self._waits else 0,
+                "max_wait_ms": round(self._max_wait * 1000, 2)
+            }
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self._close_quietly(connection)
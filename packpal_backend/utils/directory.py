@@ -0,0 +1,102 @@
+from sqlalchemy import select, bindparam
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db, User, TeamMember, normalize_title, normalize_email
+
+def prefix_upper_bound(prefix):
+    """
+    Get the smallest string greater than every string starting with prefix:
+    the prefix with its last character incremented ("mi" -> "mj").
+
+    Returns:
+        str: The bound, or None when there is none (prefix of U+10FFFF only)
+    """
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if 0xD800 <= code <= 0xDFFF:
+            # Skip surrogates, which can't be stored
+            code = 0xE000
+        if code <= 0x10FFFF:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]
+    return None
+
+def prefix_match(column, prefix):
+    """
+    Match values of column starting with prefix, as a range an index on the
+    column can answer (LIKE 'x%' only uses one under some collations).
+    """
+    upper = prefix_upper_bound(prefix)
+    if upper is None:
+        return column >= prefix
+    return db.and_(column >= prefix, column < upper)
+
+def available_users_query(search=None, exclude_checklist_id=None):
+    """
+    Build a SELECT of the users the member picker can offer, ordered by
+    (name_normalized, id) along ix_users_name_normalized. Only the columns
+    the picker shows are selected.
+
+    Args:
+        search (str): Prefix of the user's name or email, in any case
+            (extra spaces in names are ignored too)
+        exclude_checklist_id (int): Leave out users already on this checklist
+
+    Returns:
+        Select: The query; add the keyset condition and limit to page it
+    """
+    query = select(User.id, User.name, User.email, User.role, User.name_normalized)
+
+    if search and search.strip():
+        query = query.where(db.or_(
+            prefix_match(User.name_normalized, normalize_title(search)),
+            prefix_match(User.email_normalized, normalize_email(search))
+        ))
+
+    if exclude_checklist_id is not None:
+        query = query.where(~select(TeamMember.id).where(
+            TeamMember.checklist_id == exclude_checklist_id,
+            TeamMember.user_id == User.id
+        ).exists())
+
+    return query.order_by(User.name_normalized, User.id)
+
+def _backfill(connection, source, target, normalize, batch_size):
+    """Fill users.<target> with normalize(users.<source>) where it is NULL, in batches by id"""
+    users = User.__table__
+    update = users.update().where(users.c.id == bindparam('user_id')).values({target: bindparam('normalized')})
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(users.c.id, users.c[source])
+            .where(users.c.id > last_id, users.c[target].is_(None))
+            .order_by(users.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        connection.execute(update, [
+            {"user_id": row[0], "normalized": normalize(row[1])} for row in rows
+        ])
+        last_id = rows[-1][0]
+
+def backfill_normalized_names(connection, batch_size=1000):
+    """
+    Fill name_normalized for users created before the column existed.
+
+    Args:
+        connection: SQLAlchemy Connection to run the statements on
+    """
+    _backfill(connection, 'name', 'name_normalized', normalize_title, batch_size)
+
+def backfill_normalized_emails(connection, batch_size=1000):
+    """
+    Fill email_normalized for users created before the column existed.
+
+    Args:
+        connection: SQLAlchemy Connection to run the statements on
+    """
+    _backfill(connection, 'email', 'email_normalized', normalize_email, batch_size)
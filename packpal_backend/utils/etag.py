@@ -0,0 +1,84 @@
+import hashlib
+from flask import request, make_response
+from sqlalchemy import select
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db, Checklist
+from utils.access import accessible_checklist_ids_query
+
+def bump_checklist_version(checklist_id):
+    """
+    Invalidate every ETag of a checklist. Call in the same transaction as
+    any write to the checklist, its items, members or alerts.
+    """
+    bump_checklist_versions(db.session, [checklist_id])
+
+def bump_checklist_versions(connection, checklist_ids):
+    """
+    Invalidate the ETags of several checklists with one UPDATE.
+
+    Args:
+        connection: SQLAlchemy Connection or Session to run the statement on
+        checklist_ids (iterable): Checklists to bump
+    """
+    checklists = Checklist.__table__
+    connection.execute(
+        checklists.update()
+        .where(checklists.c.id.in_(list(checklist_ids)))
+        .values(version=checklists.c.version + 1)
+    )
+
+def _digest(*parts):
+    return hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+
+def checklist_etag(checklist_id, representation):
+    """
+    Build a strong ETag for one representation of a checklist from its
+    version, with a single primary key lookup. created_at goes into the
+    digest because ids can be reused after a delete (SQLite does), and a
+    new checklist starts at the same version as the one it replaces.
+
+    Args:
+        checklist_id (int): The checklist
+        representation: Anything that distinguishes responses for the same
+            version, e.g. the endpoint name and query arguments
+
+    Returns:
+        str: The ETag value, or None if the checklist does not exist
+    """
+    row = db.session.execute(
+        select(Checklist.version, Checklist.created_at).where(Checklist.id == checklist_id)
+    ).first()
+    if row is None:
+        return None
+    return f"c{checklist_id}-v{row.version}-{_digest(representation, row.created_at)}"
+
+def user_checklists_etag(user_id, representation):
+    """
+    Build a strong ETag for a response covering every checklist a user can
+    access, from the ids, versions and creation times of those checklists.
+    """
+    versions = db.session.execute(
+        select(Checklist.id, Checklist.version, Checklist.created_at)
+        .where(Checklist.id.in_(accessible_checklist_ids_query(user_id)))
+        .order_by(Checklist.id)
+    ).all()
+    return f"u{user_id}-{_digest(representation, [tuple(row) for row in versions])}"
+
+def is_not_modified(etag):
+    """Check whether the request's If-None-Match already names this ETag"""
+    return request.if_none_match.contains(etag)
+
+def not_modified(etag):
+    """Build an empty 304 response carrying the ETag"""
+    response = make_response('', 304)
+    response.set_etag(etag)
+    return response
+
+def with_etag(response, etag):
+    """Attach an ETag to a response and return it"""
+    response.set_etag(etag)
+    return response
@@ -0,0 +1,139 @@
+import json
+import queue
+import threading
+
+class Subscription:
+    """
+    A subscriber's queue of pending events for one channel.
+
+    If the subscriber falls more than max_pending events behind it is
+    closed instead of buffering without bound; SSE clients then reconnect
+    and resume from their Last-Event-ID.
+    """
+
+    def __init__(self, channel, max_pending):
+        self.channel = channel
+        self.closed = False
+        self._queue = queue.Queue(maxsize=max_pending)
+
+    def put(self, event):
+        """Queue an event; returns False if the subscriber is too far behind"""
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self.close()
+            return False
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event.
+
+        Returns:
+            dict: The event, or None if nothing arrived within the timeout
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        """Mark the subscription closed and wake up a waiting reader"""
+        self.closed = True
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+
+class EventBus:
+    """
+    Thread-safe in-process publish/subscribe bus.
+
+    Events only reach subscribers in the same process; with several worker
+    processes each worker streams the changes it handled itself, and
+    clients catch up on the rest from the alerts table when they reconnect.
+    """
+
+    def __init__(self, max_pending=1000):
+        self.max_pending = max_pending
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        """Start receiving events published to a channel"""
+        subscription = Subscription(channel, self.max_pending)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop delivering events to a subscription"""
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel, event, data, event_id=None):
+        """
+        Deliver an event to every current subscriber of a channel.
+
+        Args:
+            channel: Channel key, e.g. a checklist id
+            event (str): Event name
+            data (dict): JSON-serializable payload
+            event_id (int): Optional id clients can resume from
+        """
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+
+        message = {"event": event, "data": data, "id": event_id}
+        for subscription in subscribers:
+            if not subscription.put(message):
+                self.unsubscribe(subscription)
+
+    def subscriber_count(self, channel=None):
+        """Get the number of subscribers of one channel, or of all channels"""
+        with self._lock:
+            if channel is not None:
+                return len(self._channels.get(channel, ()))
+            return sum(len(subscribers) for subscribers in self._channels.values())
+
+# Process-wide bus; channels are checklist ids
+bus = EventBus()
+
+def format_sse(event, data, event_id=None):
+    """Encode one event in the text/event-stream wire format"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data)}")
+    return '\n'.join(lines) + '\n\n'
+
+def alert_payload(alert):
+    """Serialize an Alert the same way the alerts endpoints do"""
+    return {
+        "id": alert.id,
+        "type": alert.type,
+        "message": alert.message,
+        "checklist_id": alert.checklist_id,
+        "created_at": alert.created_at.isoformat()
+    }
+
+def publish_alerts(payloads):
+    """
+    Publish committed alerts; their ids double as SSE event ids for resuming.
+
+    Args:
+        payloads (list): alert_payload()-shaped dicts; the alert writer
+            thread builds them from the rows its INSERT returned and
+            publishes them after its own transaction commits
+    """
+    for payload in payloads:
+        bus.publish(payload['checklist_id'], 'alert', payload, event_id=payload['id'])
+
+def publish_checklist_event(checklist_id, event, data):
+    """Publish a change to a checklist's subscribers (call after commit)"""
+    bus.publish(checklist_id, event, data)
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(created_at, row_id):
+    """Build a keyset cursor of the form "<created_at ISO timestamp>,<id>" """
+    return f"{created_at.isoformat()},{row_id}"
+
+def decode_cursor(cursor):
+    """
+    Parse a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (created_at datetime, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    created_at, _, row_id = cursor.rpartition(',')
+    if not created_at:
+        raise ValueError("Invalid cursor")
+    return datetime.fromisoformat(created_at), int(row_id)
+
+def encode_key_cursor(key, row_id):
+    """Build a keyset cursor of the form "<sort key>,<id>" for a string sort key"""
+    return f"{key},{row_id}"
+
+def decode_key_cursor(cursor):
+    """
+    Parse a cursor produced by encode_key_cursor. The key may itself
+    contain commas; the id is everything after the last one.
+
+    Returns:
+        tuple: (key, id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    key, separator, row_id = cursor.rpartition(',')
+    if not separator:
+        raise ValueError("Invalid cursor")
+    return key, int(row_id)
+
+def parse_page_args(args, param='before', decode=decode_cursor):
+    """
+    Read the cursor (?before= by default) and ?limit= from request args.
+
+    Returns:
+        tuple: (decoded cursor or None, limit)
+
+    Raises:
+        ValueError: If either argument is invalid
+    """
+    before = decode(args[param]) if args.get(param) else None
+
+    limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    if limit < 1:
+        raise ValueError("limit must be positive")
+
+    return before, min(limit, MAX_PAGE_SIZE)
+
+def page_and_cursor(rows, limit, key_of, id_of, encode=encode_cursor):
+    """
+    Split rows fetched with limit + 1 into the page and the cursor of the next page.
+
+    Returns:
+        tuple: (rows of this page, cursor string or None on the last page)
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last = page[-1]
+    return page, encode(key_of(last), id_of(last))
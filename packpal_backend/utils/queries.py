@@ -0,0 +1,74 @@
+from sqlalchemy import or_, and_, exists
+from sqlalchemy.orm import joinedload, selectinload
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db, Checklist, ChecklistItem, ChecklistStats, TeamMember, User
+
+def accessible_checklists_with_stats(user_id, include_owned=True):
+    """
+    Fetch every checklist accessible to a user together with the creator name
+    and its maintained per-status item counts in a single query.
+
+    Args:
+        user_id (int): ID of the user requesting the checklists
+        include_owned (bool): Also return checklists created by the user even
+            if they are not a team member (owners and admins)
+
+    Returns:
+        list: Rows with id, name, created_by, created_at, creator_name,
+            total, to_pack, packed and delivered (counts are None for
+            checklists that have no checklist_stats row yet)
+    """
+    is_member = exists().where(and_(
+        TeamMember.checklist_id == Checklist.id,
+        TeamMember.user_id == user_id
+    ))
+
+    if include_owned:
+        access_filter = or_(Checklist.created_by == user_id, is_member)
+    else:
+        access_filter = is_member
+
+    return db.session.query(
+        Checklist.id,
+        Checklist.name,
+        Checklist.created_by,
+        Checklist.created_at,
+        User.name.label('creator_name'),
+        ChecklistStats.total,
+        ChecklistStats.to_pack,
+        ChecklistStats.packed,
+        ChecklistStats.delivered
+    ).outerjoin(User, User.id == Checklist.created_by) \
+     .outerjoin(ChecklistStats, ChecklistStats.checklist_id == Checklist.id) \
+     .filter(access_filter) \
+     .order_by(Checklist.created_at.desc(), Checklist.id.desc()) \
+     .all()
+
+# Sections of the checklist detail view that can be requested via ?fields=
+DETAIL_FIELDS = ('items', 'members')
+
+def load_checklist_detail(checklist_id, fields=DETAIL_FIELDS):
+    """
+    Load a checklist with its creator and the requested detail sections
+    eager-loaded, so serializing it does not issue per-row user lookups.
+
+    Args:
+        checklist_id (int): ID of the checklist to load
+        fields (iterable): Sections to load, any of DETAIL_FIELDS
+
+    Returns:
+        Checklist: The checklist, or None if it does not exist
+    """
+    options = [joinedload(Checklist.creator)]
+    
+    if 'items' in fields:
+        options.append(selectinload(Checklist.items).joinedload(ChecklistItem.assignee))
+    
+    if 'members' in fields:
+        options.append(selectinload(Checklist.team_members).joinedload(TeamMember.user))
+    
+    return Checklist.query.options(*options).filter_by(id=checklist_id).first()
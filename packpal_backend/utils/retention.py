@@ -0,0 +1,203 @@
+import gzip
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import select
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db, Alert, AlertRollup
+from utils.etag import bump_checklist_versions
+
+# Days each alert type is kept; types not listed are kept forever.
+# Override with ALERT_TTL_DAYS, e.g. "update=30,conflict=180".
+DEFAULT_TTLS = {'update': 30, 'conflict': 90}
+
+# Types whose expired alerts are counted into alert_rollups before deletion
+DEFAULT_ROLLUP_TYPES = ('update',)
+
+# Alerts deleted per transaction; small batches keep row locks short
+DEFAULT_BATCH_SIZE = 500
+
+class ConcurrentRetentionRun(Exception):
+    """Another run deleted alerts this run had selected"""
+
+def parse_ttls(spec):
+    """
+    Parse "type=days,type=days" into a TTL dict.
+
+    Raises:
+        ValueError: If an entry is malformed or days is not a positive integer
+    """
+    ttls = {}
+    for entry in spec.split(','):
+        if not entry.strip():
+            continue
+        alert_type, _, days = entry.partition('=')
+        if not alert_type.strip() or not days.strip().isdigit() or int(days) < 1:
+            raise ValueError(f"Invalid TTL {entry!r}, expected type=days")
+        ttls[alert_type.strip()] = int(days)
+    return ttls
+
+def configured_ttls():
+    """Get the TTLs from ALERT_TTL_DAYS, or the defaults"""
+    spec = os.getenv('ALERT_TTL_DAYS')
+    return parse_ttls(spec) if spec else dict(DEFAULT_TTLS)
+
+def expiry_cutoff(days, now):
+    """
+    Get the created_at before which alerts with a TTL of days have expired.
+    Rounded down to midnight so a day's alerts expire (and roll up) together.
+    """
+    cutoff = now - timedelta(days=days)
+    return datetime(cutoff.year, cutoff.month, cutoff.day)
+
+def _add_rollups(connection, rows):
+    """Add expired alerts to their checklist's daily counts"""
+    counts = {}
+    for row in rows:
+        key = (row.checklist_id, row.created_at.date(), row.type)
+        counts[key] = counts.get(key, 0) + 1
+
+    rollups = AlertRollup.__table__
+    for (checklist_id, day, alert_type), count in counts.items():
+        match = (rollups.c.checklist_id == checklist_id) & (rollups.c.day == day) & (rollups.c.type == alert_type)
+        result = connection.execute(rollups.update().where(match).values(count=rollups.c.count + count))
+        if result.rowcount == 0:
+            connection.execute(rollups.insert().values(
+                checklist_id=checklist_id, day=day, type=alert_type, count=count
+            ))
+
+def _archive(archive_dir, rows, now):
+    """
+    Append alerts to the day's gzipped JSON Lines archive and fsync it.
+    Each call adds a gzip member; gzip readers see one continuous file.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"alerts-{now:%Y-%m-%d}.jsonl.gz")
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as archive:
+            for row in rows:
+                archive.write(json.dumps({
+                    "id": row.id,
+                    "type": row.type,
+                    "message": row.message,
+                    "checklist_id": row.checklist_id,
+                    "created_at": row.created_at.isoformat()
+                }).encode() + b'\n')
+        raw.flush()
+        os.fsync(raw.fileno())
+
+def purge_expired_alerts(engine, ttls=None, rollup_types=DEFAULT_ROLLUP_TYPES, archive_dir=None,
+                         batch_size=DEFAULT_BATCH_SIZE, pause=0.0, now=None, log=print):
+    """
+    Delete expired alerts in small batches, one short transaction each.
+
+    Every batch is deleted, rolled up (for rollup_types), archived and its
+    checklists' versions bumped (invalidating alert ETags) in the same
+    transaction, so a batch is either fully handled or left for
+    the next run; the archive is written just before the commit, so a
+    crash can only repeat rows in it, never lose them. If another run
+    deleted a batch first, this run stops instead of counting it twice.
+
+    Args:
+        engine: SQLAlchemy Engine
+        ttls (dict): Alert type -> days to keep; defaults to configured_ttls()
+        rollup_types (iterable): Types to count into alert_rollups
+        archive_dir (str): Directory for alerts-<date>.jsonl.gz, or None
+            to delete without archiving
+        batch_size (int): Alerts per transaction
+        pause (float): Seconds to sleep between batches, to leave room
+            for other writers on busy databases
+        now (datetime): Current UTC time, for tests
+
+    Returns:
+        dict: Alert type -> number of alerts deleted
+    """
+    ttls = configured_ttls() if ttls is None else ttls
+    now = now or datetime.utcnow()
+    deleted = {}
+
+    for alert_type, days in sorted(ttls.items()):
+        cutoff = expiry_cutoff(days, now)
+        deleted[alert_type] = 0
+
+        while True:
+            try:
+                rows = _purge_batch(engine, alert_type, cutoff, alert_type in rollup_types,
+                                    archive_dir, batch_size, now)
+            except ConcurrentRetentionRun:
+                log(f"Stopping: another retention run is deleting {alert_type} alerts")
+                return deleted
+            if not rows:
+                break
+
+            deleted[alert_type] += len(rows)
+            if len(rows) < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+
+        log(f"Deleted {deleted[alert_type]} {alert_type} alert(s) older than {cutoff:%Y-%m-%d}")
+
+    return deleted
+
+def _purge_batch(engine, alert_type, cutoff, rollup, archive_dir, batch_size, now):
+    """
+    Delete, roll up and archive the oldest batch of expired alerts of a type.
+
+    Returns:
+        list: The rows deleted (empty when nothing has expired)
+    """
+    alerts = Alert.__table__
+    with engine.begin() as connection:
+        # Oldest first along ix_alerts_type_created
+        rows = connection.execute(
+            select(alerts.c.id, alerts.c.type, alerts.c.message, alerts.c.checklist_id, alerts.c.created_at)
+            .where(alerts.c.type == alert_type, alerts.c.created_at < cutoff)
+            .order_by(alerts.c.created_at, alerts.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return rows
+
+        result = connection.execute(alerts.delete().where(alerts.c.id.in_([row.id for row in rows])))
+        if result.rowcount != len(rows):
+            # Raising rolls the transaction back, so nothing is rolled up
+            # or archived twice
+            raise ConcurrentRetentionRun()
+
+        if rollup:
+            _add_rollups(connection, rows)
+        # Alert listings' ETags come from the checklist version; without
+        # a bump clients would keep getting 304s for the purged alerts
+        bump_checklist_versions(connection, {row.checklist_id for row in rows})
+        if archive_dir:
+            # Last, so a failed rollup does not leave archived rows behind
+            _archive(archive_dir, rows, now)
+    return rows
+
+def start_retention_scheduler(app, interval_hours, archive_dir=None):
+    """
+    Run purge_expired_alerts() every interval_hours in a daemon thread.
+    With several workers each runs the job; a run that finds its batch
+    already deleted by another stops and leaves the rest to that run.
+
+    Returns:
+        threading.Thread: The started thread
+    """
+    def run():
+        while True:
+            time.sleep(interval_hours * 3600)
+            try:
+                with app.app_context():
+                    purge_expired_alerts(db.engine, archive_dir=archive_dir, log=app.logger.info)
+            except Exception as e:
+                app.logger.error(f"Alert retention failed: {e}")
+
+    thread = threading.Thread(target=run, name='alert-retention', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,252 @@
+from collections import Counter
+from sqlalchemy import select, func, case, or_
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from models import db, Checklist, ChecklistItem, ChecklistStats
+
+# Item status -> checklist_stats counter column
+STATUS_COLUMNS = {
+    'To Pack': 'to_pack',
+    'Packed': 'packed',
+    'Delivered': 'delivered'
+}
+
+STATS_COLUMNS = ('checklist_id', 'total', 'to_pack', 'packed', 'delivered')
+
+def _status_count(status):
+    """Conditional aggregate counting the joined items with the given status"""
+    return func.coalesce(func.sum(case((ChecklistItem.status == status, 1), else_=0)), 0)
+
+def counted_stats_query(checklist_ids=None):
+    """
+    Build a SELECT that computes checklist_stats rows from the items table.
+
+    Args:
+        checklist_ids (iterable): Limit to these checklists, or None for all
+    """
+    query = select(
+        Checklist.id.label('checklist_id'),
+        func.count(ChecklistItem.id).label('total'),
+        _status_count('To Pack').label('to_pack'),
+        _status_count('Packed').label('packed'),
+        _status_count('Delivered').label('delivered')
+    ).select_from(Checklist) \
+     .outerjoin(ChecklistItem, ChecklistItem.checklist_id == Checklist.id) \
+     .group_by(Checklist.id)
+
+    if checklist_ids is not None:
+        query = query.where(Checklist.id.in_(list(checklist_ids)))
+    return query
+
+def rebuild_stats(connection, checklist_ids=None):
+    """
+    Recompute stats rows from scratch.
+
+    Args:
+        connection: SQLAlchemy Connection or Session to run the statements on
+        checklist_ids (iterable): Checklists to rebuild, or None for all
+    """
+    stats = ChecklistStats.__table__
+
+    delete = stats.delete()
+    if checklist_ids is not None:
+        checklist_ids = list(checklist_ids)
+        delete = delete.where(stats.c.checklist_id.in_(checklist_ids))
+
+    connection.execute(delete)
+    connection.execute(stats.insert().from_select(STATS_COLUMNS, counted_stats_query(checklist_ids)))
+
+def find_drift(connection):
+    """
+    Compare the stored counters with the items table.
+
+    Returns:
+        list: Rows with checklist_id, the counted values and the stored
+            values (stored_*, None when the row is missing) for every
+            checklist whose counters are wrong
+    """
+    stats = ChecklistStats.__table__
+    counted = counted_stats_query().subquery()
+
+    mismatch = or_(stats.c.checklist_id.is_(None), *[
+        counted.c[column] != stats.c[column] for column in STATS_COLUMNS[1:]
+    ])
+
+    query = select(
+        counted,
+        *[stats.c[column].label(f'stored_{column}') for column in STATS_COLUMNS[1:]]
+    ).select_from(counted) \
+     .outerjoin(stats, stats.c.checklist_id == counted.c.checklist_id) \
+     .where(mismatch) \
+     .order_by(counted.c.checklist_id)
+
+    return connection.execute(query).all()
+
+def record_item_changes(checklist_id, added=(), removed=()):
+    """
+    Update a checklist's counters inside the current transaction.
+
+    Runs one atomic UPDATE ... SET col = col + n, so concurrent increments
+    are not lost; but the counters are only right if the deltas are.
+    Statuses read earlier in a request may already be stale, so changes to
+    existing items go through change_item_statuses() and delete_items(),
+    which count only what their guarded writes actually changed. A status
+    change is one removed and one added status.
+
+    Args:
+        checklist_id (int): Checklist whose items changed
+        added (iterable): Statuses of items created (or moved into)
+        removed (iterable): Statuses of items deleted (or moved out of)
+    """
+    added, removed = list(added), list(removed)
+    deltas = Counter(added)
+    deltas.subtract(removed)
+
+    stats = ChecklistStats.__table__
+    values = {
+        column: stats.c[column] + deltas[status]
+        for status, column in STATUS_COLUMNS.items() if deltas[status]
+    }
+    if len(added) != len(removed):
+        values['total'] = stats.c.total + (len(added) - len(removed))
+
+    if not values:
+        return
+
+    result = db.session.execute(
+        stats.update().where(stats.c.checklist_id == checklist_id).values(**values)
+    )
+
+    if result.rowcount == 0:
+        # Checklist created before the stats table existed; count it instead,
+        # including this transaction's pending item changes
+        db.session.flush()
+        rebuild_stats(db.session, [checklist_id])
+
+def ensure_stats(checklist_ids):
+    """Create the missing counters of checklists that predate the stats table and commit"""
+    if checklist_ids:
+        rebuild_stats(db.session, checklist_ids)
+        db.session.commit()
+
+def load_stats(checklist_id):
+    """
+    Get a checklist's counters with a primary key lookup.
+
+    Returns:
+        ChecklistStats: The counters, or None if the checklist does not exist
+    """
+    stats = db.session.get(ChecklistStats, checklist_id)
+    if stats is None and db.session.get(Checklist, checklist_id) is not None:
+        ensure_stats([checklist_id])
+        stats = db.session.get(ChecklistStats, checklist_id)
+    return stats
+
+# Rounds of re-reading and retrying items another request changed first
+MAX_STATUS_ATTEMPTS = 3
+
+class ConcurrentItemChange(Exception):
+    """Items were changed by another request in a way this one cannot count; roll back and retry"""
+
+def _lock_statuses(item_ids):
+    """
+    Read the current status of items, locking their rows where the database
+    supports SELECT ... FOR UPDATE (SQLite ignores it; the guards below
+    cover it there).
+
+    Returns:
+        dict: Item id -> status, for the items that still exist
+    """
+    items = ChecklistItem.__table__
+    return dict(db.session.execute(
+        select(items.c.id, items.c.status).where(items.c.id.in_(list(item_ids))).with_for_update()
+    ).all())
+
+def change_item_statuses(checklist_id, new_statuses):
+    """
+    Set the status of items and count the moves into the checklist's counters.
+
+    Every UPDATE is guarded by the status it moves from (... WHERE id IN (...)
+    AND status = :old), so when two requests make the same change only the
+    one whose UPDATE matched counts it. Items whose status changed since
+    they were read are read again and retried.
+
+    Args:
+        checklist_id (int): Checklist the items belong to
+        new_statuses (dict): Item id -> new status
+
+    Returns:
+        dict: Item id -> previous status, for the items that moved
+
+    Raises:
+        ConcurrentItemChange: If an UPDATE matched only some of its rows
+            (the ones moved cannot be told apart) or retries ran out
+    """
+    items = ChecklistItem.__table__
+    moved = {}
+    pending = dict(new_statuses)
+
+    for _ in range(MAX_STATUS_ATTEMPTS):
+        if not pending:
+            break
+        current = _lock_statuses(pending)
+        groups = {}
+        for item_id, status in pending.items():
+            if current.get(item_id) not in (None, status):
+                groups.setdefault((current[item_id], status), []).append(item_id)
+
+        pending = {}
+        for (old, new), ids in groups.items():
+            matched = db.session.execute(
+                items.update().where(items.c.id.in_(ids), items.c.status == old).values(status=new)
+            ).rowcount
+            if matched == len(ids):
+                moved.update(dict.fromkeys(ids, old))
+            elif matched == 0:
+                # Changed after the read; read again
+                pending.update(dict.fromkeys(ids, new))
+            else:
+                raise ConcurrentItemChange()
+    else:
+        if pending:
+            raise ConcurrentItemChange()
+
+    record_item_changes(
+        checklist_id,
+        added=[new_statuses[item_id] for item_id in moved],
+        removed=list(moved.values())
+    )
+    return moved
+
+def delete_items(checklist_id, item_ids):
+    """
+    Delete items and take them off the checklist's counters.
+
+    Deletes are guarded by the status they are counted under (one DELETE per
+    status), so an item deleted or moved by another request meanwhile is
+    not counted twice or under the wrong status.
+
+    Returns:
+        dict: Item id -> status, for the items deleted
+
+    Raises:
+        ConcurrentItemChange: If a DELETE did not match every row it counted
+    """
+    items = ChecklistItem.__table__
+    current = _lock_statuses(item_ids)
+
+    by_status = {}
+    for item_id, status in current.items():
+        by_status.setdefault(status, []).append(item_id)
+    for status, ids in by_status.items():
+        deleted = db.session.execute(
+            items.delete().where(items.c.id.in_(ids), items.c.status == status)
+        ).rowcount
+        if deleted != len(ids):
+            raise ConcurrentItemChange()
+
+    record_item_changes(checklist_id, removed=list(current.values()))
+    return current
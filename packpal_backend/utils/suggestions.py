@@ -0,0 +1,312 @@
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+from bisect import bisect_right
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.cache import TTLCache, MISSING
+
+# Rule catalog shipped with the app; SUGGESTION_CATALOG points to another one
+DEFAULT_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'suggestion_catalog.json'
+)
+
+# How often (seconds) to check the catalog file for changes
+CATALOG_CHECK_INTERVAL = 1.0
+
+# Distinguishes engines compiled from different catalogs in cache keys
+_generations = itertools.count(1)
+
+def _merge_unique(*item_lists):
+    """Concatenate item lists keeping the first item with each title"""
+    seen = set()
+    merged = []
+    for items in item_lists:
+        for item in items:
+            if item['title'] not in seen:
+                seen.add(item['title'])
+                merged.append(item)
+    return tuple(merged)
+
+def _trie_pattern(words):
+    """
+    Build a regex matching the longest of the given words, shaped as a
+    trie ("las(?: vegas)?" rather than "las vegas|las"). The regex engine
+    then only follows branches that match the next character, instead of
+    trying every word at every position.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        # Optional (and greedy) where a shorter word ends here
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+class ThresholdRules:
+    """
+    Items for "value >= min" rules. Every band's items are merged ahead of
+    time, so a lookup is one binary search whatever the number of rules.
+    """
+
+    def __init__(self, rules):
+        rules = sorted(rules, key=lambda rule: rule['min'])
+        self.bounds = [rule['min'] for rule in rules]
+        # bands[i] holds the items of every rule whose min <= value when
+        # bisect_right(bounds, value) == i
+        self.bands = [()]
+        for rule in rules:
+            self.bands.append(_merge_unique(self.bands[-1], rule['items']))
+
+    def band(self, value):
+        """Get the index of the band a value falls into"""
+        return bisect_right(self.bounds, value)
+
+    def items(self, value):
+        return self.bands[self.band(value)]
+
+class SuggestionEngine:
+    """
+    Packing suggestions compiled from a rule catalog.
+
+    Trip types are a dict lookup; destinations are matched with a single
+    trie-shaped regex over every known place name, so the cost of a
+    request does not grow with the size of the catalog.
+    """
+
+    def __init__(self, catalog):
+        self.version = catalog.get('version', 1)
+        self.generation = next(_generations)
+
+        self.trip_types = {
+            name.lower(): _merge_unique(items)
+            for name, items in catalog.get('trip_types', {}).items()
+        }
+
+        # Place name -> climates, in catalog order
+        self.climate_order = list(catalog.get('climates', {}))
+        self.climate_items = {
+            climate: _merge_unique(rule['items'])
+            for climate, rule in catalog.get('climates', {}).items()
+        }
+        place_climates = {}
+        for climate, rule in catalog.get('climates', {}).items():
+            for place in rule['destinations']:
+                place_climates.setdefault(place.lower(), set()).add(climate)
+
+        # The regex reports the longest name starting at each position, so
+        # also credit every shorter name that is a prefix of it ("las" in
+        # "las vegas"); names starting later are found at their own position
+        self.place_climates = {}
+        for place, climates in place_climates.items():
+            climates = set(climates)
+            for end in range(1, len(place)):
+                climates |= place_climates.get(place[:end], set())
+            self.place_climates[place] = frozenset(climates)
+
+        self.place_pattern = None
+        if place_climates:
+            # Lookahead so overlapping names are all found, like "in" checks
+            self.place_pattern = re.compile(f"(?=({_trie_pattern(place_climates)}))")
+
+        self.duration_rules = ThresholdRules(catalog.get('duration_days', []))
+        self.group_rules = ThresholdRules(catalog.get('group_size', []))
+
+    def climates_for(self, destination):
+        """
+        Get the climates of every known place mentioned in a destination.
+
+        Returns:
+            tuple: Climate names in catalog order
+        """
+        if not self.place_pattern or not destination:
+            return ()
+        found = set()
+        for match in self.place_pattern.finditer(destination.lower()):
+            found |= self.place_climates[match.group(1)]
+        return tuple(climate for climate in self.climate_order if climate in found)
+
+    def profile(self, trip_type, destination, duration_days, group_size):
+        """
+        Reduce trip inputs to what the rules can tell apart: the known trip
+        type (or ''), the destination's climates and the duration and group
+        size bands. Trips with the same profile get the same suggestions.
+
+        Returns:
+            tuple: Hashable profile, usable as a cache key
+        """
+        trip_type = (trip_type or '').lower()
+        return (
+            self.generation,
+            trip_type if trip_type in self.trip_types else '',
+            self.climates_for(destination),
+            self.duration_rules.band(duration_days),
+            self.group_rules.band(group_size)
+        )
+
+    def suggest_profile(self, profile):
+        """Build the suggestion list for a profile from profile()"""
+        _, trip_type, climates, duration_band, group_band = profile
+        return _merge_unique(
+            self.trip_types.get(trip_type, ()),
+            *[self.climate_items[climate] for climate in climates],
+            self.duration_rules.bands[duration_band],
+            self.group_rules.bands[group_band]
+        )
+
+    def suggest(self, trip_type, destination, duration_days, group_size):
+        """
+        Build the suggestion list for a trip.
+
+        Returns:
+            tuple: Suggestion dicts with title and reason, one per title.
+                The dicts are shared between calls and must not be modified.
+        """
+        return self.suggest_profile(self.profile(trip_type, destination, duration_days, group_size))
+
+def load_catalog(path=None):
+    """Read a rule catalog from a JSON file"""
+    path = path or _catalog_path()
+    with open(path) as catalog_file:
+        return json.load(catalog_file)
+
+def _catalog_path():
+    return os.getenv('SUGGESTION_CATALOG', DEFAULT_CATALOG_PATH)
+
+def _catalog_mtime():
+    try:
+        return os.stat(_catalog_path()).st_mtime_ns
+    except OSError:
+        return None
+
+# Encoded responses keyed by engine.profile(); entries never expire, as
+# they only change when the catalog does, which clears the cache
+_response_cache = TTLCache(maxsize=int(os.getenv('SUGGESTION_CACHE_SIZE', 1024)))
+
+_engine_lock = threading.Lock()
+_catalog_state = {"mtime": _catalog_mtime(), "checked_at": time.monotonic()}
+
+# Compiled once when the app starts
+engine = SuggestionEngine(load_catalog())
+
+def get_engine():
+    """
+    Get the compiled suggestion engine, recompiling it if the catalog file
+    changed (checked at most every CATALOG_CHECK_INTERVAL seconds).
+    """
+    now = time.monotonic()
+    if now - _catalog_state["checked_at"] >= CATALOG_CHECK_INTERVAL:
+        _catalog_state["checked_at"] = now
+        mtime = _catalog_mtime()
+        if mtime != _catalog_state["mtime"]:
+            try:
+                reload_engine()
+            except (OSError, ValueError) as e:
+                # Keep serving the last good catalog; retry on the next check
+                print(f"Error reloading suggestion catalog: {e}")
+    return engine
+
+def reload_engine(catalog=None):
+    """
+    Recompile the engine from a catalog dict, or from the catalog file,
+    and drop every cached response.
+
+    Returns:
+        SuggestionEngine: The new engine
+    """
+    global engine
+    with _engine_lock:
+        mtime = _catalog_mtime()
+        engine = SuggestionEngine(catalog if catalog is not None else load_catalog())
+        _catalog_state["mtime"] = mtime
+        _response_cache.clear()
+    return engine
+
+def suggestions_json(trip_type, destination, duration_days, group_size, encode):
+    """
+    Get the encoded {"suggestions": [...]} response body for a trip,
+    served from an LRU cache keyed by the trip's profile.
+
+    Args:
+        encode (callable): Serializes the response dict to a str, e.g. the
+            app's JSON provider, so cached bodies match jsonify()
+
+    Returns:
+        bytes: The response body
+    """
+    current = get_engine()
+    profile = current.profile(trip_type, destination, duration_days, group_size)
+
+    body = _response_cache.get(profile)
+    if body is MISSING:
+        body = encode({"suggestions": list(current.suggest_profile(profile))}).encode()
+        _response_cache.set(profile, body)
+    return body
+
+def suggest_many(trips):
+    """
+    Evaluate many trips in one pass; trips with the same profile share
+    one evaluation.
+
+    Args:
+        trips (list): (trip_type, destination, duration_days, group_size) tuples
+
+    Returns:
+        list: Tuples of suggestion dicts, in input order
+    """
+    current = get_engine()
+    by_profile = {}
+    results = []
+    for trip in trips:
+        profile = current.profile(*trip)
+        if profile not in by_profile:
+            by_profile[profile] = current.suggest_profile(profile)
+        results.append(by_profile[profile])
+    return results
+
+def merge_suggestions(results, group_sizes):
+    """
+    Merge per-trip suggestions into one packing list.
+
+    Args:
+        results (list): Suggestion tuples from suggest_many()
+        group_sizes (list): Group size of each trip, in the same order
+
+    Returns:
+        list: One dict per title (first reason wins) with "count", the total
+            group size of the trips it was suggested for, and "trips"
+    """
+    merged = {}
+    for suggestions, group_size in zip(results, group_sizes):
+        for item in suggestions:
+            entry = merged.get(item['title'])
+            if entry is None:
+                entry = merged[item['title']] = {
+                    "title": item['title'],
+                    "reason": item['reason'],
+                    "count": 0,
+                    "trips": 0
+                }
+            entry["count"] += group_size
+            entry["trips"] += 1
+    return list(merged.values())
+
+def cache_stats():
+    """Get response cache counters and the catalog version for monitoring"""
+    stats = _response_cache.stats()
+    stats["catalog_version"] = engine.version
+    return stats